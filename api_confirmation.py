@@ -6,7 +6,10 @@ Provides user preview and confirmation for InfoBlox API calls before execution
 
 import json
 import re
-from typing import Dict, Any, Optional, Tuple
+import sys
+from functools import cached_property
+from typing import Dict, Any, Callable, Optional, Tuple
+from urllib.parse import urlencode
 from config import get_settings
 
 # ANSI colors
@@ -23,114 +26,136 @@ class Colors:
     BRIGHT_YELLOW = '\033[93m'
 
 
+# Accepted confirmation answers (empty input defaults to yes)
+_YES = frozenset({'', 'y', 'yes'})
+_NO = frozenset({'n', 'no'})
+_EDIT = frozenset({'e', 'edit'})
+
+
+def _api_info(tool_name: str, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+              data: Optional[Dict[str, Any]] = None, description: str = "") -> Dict[str, Any]:
+    """Build the api_info dict shared by preview, curl and edit helpers"""
+    return {
+        "tool_name": tool_name,
+        "method": method,
+        "path": path,
+        "params": params if params is not None else {},
+        "data": data,
+        # Serialized body shared by the preview and the curl command
+        "_data_json": json.dumps(data, indent=2) if data else None,
+        "description": description
+    }
+
+
+def _map_list_networks(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    params = {"_max_results": tool_input.get("max_results", 100)}
+    if tool_input.get("return_fields"):
+        params["_return_fields"] = tool_input["return_fields"]
+    return _api_info("infoblox_list_networks", "GET", "network", params,
+                     description="List networks from InfoBlox")
+
+
+def _map_get_network(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    params = {}
+    if tool_input.get("return_fields"):
+        params["_return_fields"] = tool_input["return_fields"]
+    return _api_info("infoblox_get_network", "GET", tool_input.get("ref", "<NETWORK_REF>"), params,
+                     description="Get specific network details")
+
+
+def _map_create_network(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    data = {"network": tool_input.get("network", "<NETWORK_CIDR>")}
+    if tool_input.get("comment"):
+        data["comment"] = tool_input["comment"]
+    # Add any extra kwargs
+    for key, value in tool_input.items():
+        if key not in ("network", "comment"):
+            data[key] = value
+    return _api_info("infoblox_create_network", "POST", "network", data=data,
+                     description="Create new network")
+
+
+def _map_search_records(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    record_type = tool_input.get("record_type", "a")
+    params = {"_max_results": tool_input.get("max_results", 100)}
+    if tool_input.get("name"):
+        params["name"] = tool_input["name"]
+    if tool_input.get("value"):
+        params["ipv4addr"] = tool_input["value"]
+    return _api_info("infoblox_search_records", "GET", f"record:{record_type}", params,
+                     description=f"Search {record_type.upper()} DNS records")
+
+
+def _map_list_dhcp_leases(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    params = {"_max_results": tool_input.get("max_results", 100)}
+    if tool_input.get("network"):
+        params["network"] = tool_input["network"]
+    if tool_input.get("mac"):
+        params["hardware"] = tool_input["mac"]
+    return _api_info("infoblox_list_dhcp_leases", "GET", "lease", params,
+                     description="List DHCP leases")
+
+
+def _map_query(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    params = {"_max_results": tool_input.get("max_results", 100)}
+    if tool_input.get("filters"):
+        params.update(tool_input["filters"])
+    return _api_info("infoblox_query", "GET", tool_input.get("object_type", "<OBJECT_TYPE>"), params,
+                     description="Generic InfoBlox query")
+
+
+# Tool name -> api_info builder
+_TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "infoblox_list_networks": _map_list_networks,
+    "infoblox_get_network": _map_get_network,
+    "infoblox_create_network": _map_create_network,
+    "infoblox_search_records": _map_search_records,
+    "infoblox_list_dhcp_leases": _map_list_dhcp_leases,
+    "infoblox_query": _map_query,
+}
+
+
 class APICallConfirmation:
     """Handles API call preview, confirmation, and editing"""
 
+    # Preview box geometry and pre-rendered borders
+    _WIDTH = 70
+    _TOP = f"{Colors.BRIGHT_CYAN}┌{'─' * (_WIDTH - 2)}┐{Colors.RESET}"
+    _MID = f"{Colors.BRIGHT_CYAN}├{'─' * (_WIDTH - 2)}┤{Colors.RESET}"
+    _BOT = f"{Colors.BRIGHT_CYAN}└{'─' * (_WIDTH - 2)}┘{Colors.RESET}"
+    _BLANK_ROW = f"{Colors.BRIGHT_CYAN}│{' ' * (_WIDTH - 2)}│{Colors.RESET}"
+    _RULE = f"{Colors.BRIGHT_CYAN}{'─' * _WIDTH}{Colors.RESET}"
+    _HEADER_ROW = f"{Colors.BRIGHT_CYAN}│{Colors.BOLD} 🔍 API Call Preview{' ' * (_WIDTH - 21)}│{Colors.RESET}"
+    _PARAMS_ROW = f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Parameters:{Colors.RESET}{' ' * (_WIDTH - 14)}│{Colors.RESET}"
+    _BODY_ROW = f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Request Body:{Colors.RESET}{' ' * (_WIDTH - 16)}│{Colors.RESET}"
+    _CURL_ROW = f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Curl Equivalent:{Colors.RESET}{' ' * (_WIDTH - 19)}│{Colors.RESET}"
+
+    # Confirmation prompts
+    _CONFIRM_PROMPT = f"{Colors.BRIGHT_YELLOW}Execute? (yes/no/edit) [{Colors.BRIGHT_WHITE}yes{Colors.BRIGHT_YELLOW}]: {Colors.RESET}"
+    _CONFIRM_RETRY = f"{Colors.YELLOW}Please enter 'yes', 'no', or 'edit'{Colors.RESET}"
+
     def __init__(self):
-        self._settings = None
-        self._base_url = None
+        # The last rendered preview and the api_info fields it depends on, so
+        # redrawing after an edit that changed nothing skips the render
+        self._last_preview: Optional[Tuple[Tuple, str]] = None
 
-    @property
+    @cached_property
     def settings(self):
         """Lazy load settings only when needed"""
-        if self._settings is None:
-            self._settings = get_settings()
-        return self._settings
+        return get_settings()
 
-    @property
+    @cached_property
     def base_url(self):
         """Lazy load base URL only when needed"""
-        if self._base_url is None:
-            self._base_url = self.settings.get_infoblox_base_url()
-        return self._base_url
+        return self.settings.get_infoblox_base_url()
 
     def map_tool_to_api_call(self, tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
         """Map tool call to API details (method, path, params)"""
-
-        # Parse tool name to determine endpoint and method
-        api_info = {
-            "tool_name": tool_name,
-            "method": "GET",  # default
-            "path": "",
-            "params": {},
-            "data": None,
-            "description": ""
-        }
-
-        # Map each tool to its API details
-        if tool_name == "infoblox_list_networks":
-            api_info["method"] = "GET"
-            api_info["path"] = "network"
-            api_info["params"] = {
-                "_max_results": tool_input.get("max_results", 100)
-            }
-            if tool_input.get("return_fields"):
-                api_info["params"]["_return_fields"] = tool_input["return_fields"]
-            api_info["description"] = "List networks from InfoBlox"
-
-        elif tool_name == "infoblox_get_network":
-            api_info["method"] = "GET"
-            api_info["path"] = tool_input.get("ref", "<NETWORK_REF>")
-            api_info["params"] = {}
-            if tool_input.get("return_fields"):
-                api_info["params"]["_return_fields"] = tool_input["return_fields"]
-            api_info["description"] = "Get specific network details"
-
-        elif tool_name == "infoblox_create_network":
-            api_info["method"] = "POST"
-            api_info["path"] = "network"
-            api_info["data"] = {
-                "network": tool_input.get("network", "<NETWORK_CIDR>")
-            }
-            if tool_input.get("comment"):
-                api_info["data"]["comment"] = tool_input["comment"]
-            # Add any extra kwargs
-            for key, value in tool_input.items():
-                if key not in ["network", "comment"]:
-                    api_info["data"][key] = value
-            api_info["description"] = "Create new network"
-
-        elif tool_name == "infoblox_search_records":
-            record_type = tool_input.get("record_type", "a")
-            api_info["method"] = "GET"
-            api_info["path"] = f"record:{record_type}"
-            api_info["params"] = {
-                "_max_results": tool_input.get("max_results", 100)
-            }
-            if tool_input.get("name"):
-                api_info["params"]["name"] = tool_input["name"]
-            if tool_input.get("value"):
-                api_info["params"]["ipv4addr"] = tool_input["value"]
-            api_info["description"] = f"Search {record_type.upper()} DNS records"
-
-        elif tool_name == "infoblox_list_dhcp_leases":
-            api_info["method"] = "GET"
-            api_info["path"] = "lease"
-            api_info["params"] = {
-                "_max_results": tool_input.get("max_results", 100)
-            }
-            if tool_input.get("network"):
-                api_info["params"]["network"] = tool_input["network"]
-            if tool_input.get("mac"):
-                api_info["params"]["hardware"] = tool_input["mac"]
-            api_info["description"] = "List DHCP leases"
-
-        elif tool_name == "infoblox_query":
-            api_info["method"] = "GET"
-            api_info["path"] = tool_input.get("object_type", "<OBJECT_TYPE>")
-            api_info["params"] = {
-                "_max_results": tool_input.get("max_results", 100)
-            }
-            if tool_input.get("filters"):
-                api_info["params"].update(tool_input["filters"])
-            api_info["description"] = "Generic InfoBlox query"
-
-        else:
+        handler = _TOOL_HANDLERS.get(tool_name)
+        if handler is None:
             # Unknown tool - return generic info
-            api_info["description"] = f"Execute {tool_name}"
-            api_info["path"] = "<unknown>"
-
-        return api_info
+            return _api_info(tool_name, "GET", "<unknown>", description=f"Execute {tool_name}")
+        return handler(tool_input)
 
     def generate_curl_command(self, api_info: Dict[str, Any], username: Optional[str] = None) -> str:
         """Generate curl command equivalent with password masked"""
@@ -144,10 +169,9 @@ class APICallConfirmation:
         # Build URL
         url = f"{self.base_url}/{path.lstrip('/')}"
 
-        # Add query parameters
+        # Add query parameters (percent-encoded so the command can be pasted as-is)
         if params:
-            param_str = "&".join([f"{k}={v}" for k, v in params.items()])
-            url = f"{url}?{param_str}"
+            url = f"{url}?{urlencode(params)}"
 
         # Build curl command
         curl_parts = [
@@ -157,7 +181,7 @@ class APICallConfirmation:
 
         # Add data for POST/PUT
         if data:
-            json_data = json.dumps(data, indent=2)
+            json_data = api_info.get("_data_json") or json.dumps(data, indent=2)
             curl_parts.append(f"-H 'Content-Type: application/json'")
             curl_parts.append(f"-d '{json_data}'")
 
@@ -169,64 +193,89 @@ class APICallConfirmation:
     def display_api_preview(self, api_info: Dict[str, Any], username: Optional[str] = None) -> None:
         """Display formatted API call preview"""
 
-        width = 70
         user = username or self.settings.infoblox_user
-
-        print()
-        print(f"{Colors.BRIGHT_CYAN}{'┌' + '─' * (width-2) + '┐'}{Colors.RESET}")
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.BOLD} 🔍 API Call Preview{' ' * (width-21)}│{Colors.RESET}")
-        print(f"{Colors.BRIGHT_CYAN}{'├' + '─' * (width-2) + '┤'}{Colors.RESET}")
+        cache_key = (
+            api_info["description"],
+            api_info["method"],
+            api_info["path"],
+            json.dumps(api_info.get("params"), sort_keys=True, default=str),
+            json.dumps(api_info.get("data"), sort_keys=True, default=str),
+            user,
+        )
+        if self._last_preview is not None and self._last_preview[0] == cache_key:
+            sys.stdout.write(self._last_preview[1])
+            return
+
+        # Bind colors locally; this runs for every InfoBlox tool call
+        cyan, reset, white, yellow, dim = (
+            Colors.BRIGHT_CYAN, Colors.RESET, Colors.BRIGHT_WHITE, Colors.YELLOW, Colors.DIM
+        )
+        width = self._WIDTH
+        value_width = width - 15  # after "│ Label:     "
+        text_width = width - 5    # after "│   "
+
+        # Rows are collected and written in one call
+        lines = [
+            "",
+            self._TOP,
+            self._HEADER_ROW,
+            self._MID,
+        ]
 
         # Description
         desc = api_info["description"]
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.BRIGHT_WHITE}{desc}{' ' * (width-len(desc)-3)}│{Colors.RESET}")
-        print(f"{Colors.BRIGHT_CYAN}│{' ' * (width-2)}│{Colors.RESET}")
+        lines.append(f"{cyan}│{reset} {white}{desc:<{width - 3}}│{reset}")
+        lines.append(self._BLANK_ROW)
 
         # Method
         method = api_info["method"]
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Method:{Colors.RESET}     {Colors.BRIGHT_WHITE}{method}{' ' * (width-len(method)-15)}│{Colors.RESET}")
+        lines.append(f"{cyan}│{reset} {yellow}Method:{reset}     {white}{method:<{value_width}}│{reset}")
 
         # Endpoint
         path = api_info["path"]
         full_path = f"/wapi/{self.settings.wapi_version}/{path}"
         if len(full_path) > width - 18:
             full_path = full_path[:width-21] + "..."
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Endpoint:{Colors.RESET}   {Colors.BRIGHT_WHITE}{full_path}{' ' * (width-len(full_path)-15)}│{Colors.RESET}")
+        lines.append(f"{cyan}│{reset} {yellow}Endpoint:{reset}   {white}{full_path:<{value_width}}│{reset}")
 
         # Username
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Username:{Colors.RESET}   {Colors.BRIGHT_WHITE}{user}{' ' * (width-len(user)-15)}│{Colors.RESET}")
+        lines.append(f"{cyan}│{reset} {yellow}Username:{reset}   {white}{user:<{value_width}}│{reset}")
 
         # Parameters or Data
         if api_info.get("params"):
-            print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Parameters:{Colors.RESET}{' ' * (width-14)}│{Colors.RESET}")
+            lines.append(self._PARAMS_ROW)
             for key, value in api_info["params"].items():
                 param_line = f"  • {key}: {value}"
                 if len(param_line) > width - 4:
                     param_line = param_line[:width-7] + "..."
-                print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET}   {Colors.BRIGHT_WHITE}{param_line}{' ' * (width-len(param_line)-5)}│{Colors.RESET}")
+                lines.append(f"{cyan}│{reset}   {white}{param_line:<{text_width}}│{reset}")
 
         if api_info.get("data"):
-            print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Request Body:{Colors.RESET}{' ' * (width-16)}│{Colors.RESET}")
-            data_str = json.dumps(api_info["data"], indent=2)
+            lines.append(self._BODY_ROW)
+            data_str = api_info.get("_data_json") or json.dumps(api_info["data"], indent=2)
             for line in data_str.split('\n'):
                 if len(line) > width - 6:
                     line = line[:width-9] + "..."
-                print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET}   {Colors.BRIGHT_WHITE}{line}{' ' * (width-len(line)-5)}│{Colors.RESET}")
+                lines.append(f"{cyan}│{reset}   {white}{line:<{text_width}}│{reset}")
 
-        print(f"{Colors.BRIGHT_CYAN}│{' ' * (width-2)}│{Colors.RESET}")
+        lines.append(self._BLANK_ROW)
 
         # Curl command
-        print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET} {Colors.YELLOW}Curl Equivalent:{Colors.RESET}{' ' * (width-19)}│{Colors.RESET}")
+        lines.append(self._CURL_ROW)
         curl_cmd = self.generate_curl_command(api_info, user)
         for line in curl_cmd.split('\n'):
             # Trim long lines
             display_line = line.strip()
             if len(display_line) > width - 6:
                 display_line = display_line[:width-9] + "..."
-            print(f"{Colors.BRIGHT_CYAN}│{Colors.RESET}   {Colors.DIM}{display_line}{' ' * (width-len(display_line)-5)}│{Colors.RESET}")
+            lines.append(f"{cyan}│{reset}   {dim}{display_line:<{text_width}}│{reset}")
 
-        print(f"{Colors.BRIGHT_CYAN}{'└' + '─' * (width-2) + '┘'}{Colors.RESET}")
-        print()
+        lines.append(self._BOT)
+        lines.append("")
+
+        rendered = "\n".join(lines) + "\n"
+        self._last_preview = (cache_key, rendered)
+        sys.stdout.write(rendered)
 
     def get_user_confirmation(self) -> Tuple[str, Optional[Dict[str, Any]]]:
         """
@@ -238,16 +287,16 @@ class APICallConfirmation:
 
         while True:
             try:
-                response = input(f"{Colors.BRIGHT_YELLOW}Execute? (yes/no/edit) [{Colors.BRIGHT_WHITE}yes{Colors.BRIGHT_YELLOW}]: {Colors.RESET}").strip().lower()
+                response = input(self._CONFIRM_PROMPT).strip().lower()
 
-                if not response or response in ['y', 'yes']:
+                if response in _YES:
                     return ('yes', None)
-                elif response in ['n', 'no']:
+                elif response in _NO:
                     return ('no', None)
-                elif response in ['e', 'edit']:
+                elif response in _EDIT:
                     return ('edit', None)
                 else:
-                    print(f"{Colors.YELLOW}Please enter 'yes', 'no', or 'edit'{Colors.RESET}")
+                    print(self._CONFIRM_RETRY)
 
             except (EOFError, KeyboardInterrupt):
                 print()
@@ -255,41 +304,45 @@ class APICallConfirmation:
 
     def edit_parameters(self, api_info: Dict[str, Any]) -> Dict[str, Any]:
         """Allow user to edit API call parameters"""
+        reset, white, yellow = Colors.RESET, Colors.BRIGHT_WHITE, Colors.YELLOW
 
-        print()
-        print(f"{Colors.BRIGHT_CYAN}{'─' * 70}{Colors.RESET}")
-        print(f"{Colors.BRIGHT_WHITE}Edit Mode{Colors.RESET} - Press Enter to keep current value")
-        print(f"{Colors.BRIGHT_CYAN}{'─' * 70}{Colors.RESET}")
-        print()
+        sys.stdout.write("\n".join([
+            "",
+            self._RULE,
+            f"{white}Edit Mode{reset} - Press Enter to keep current value",
+            self._RULE,
+            "",
+        ]) + "\n")
 
         # Edit username
         current_user = self.settings.infoblox_user
-        new_user = input(f"{Colors.YELLOW}Username [{Colors.BRIGHT_WHITE}{current_user}{Colors.YELLOW}]: {Colors.RESET}").strip()
+        new_user = input(f"{yellow}Username [{white}{current_user}{yellow}]: {reset}").strip()
         if new_user:
             api_info["_username"] = new_user
 
         # Edit parameters
         if api_info.get("params"):
             print()
-            print(f"{Colors.YELLOW}Parameters:{Colors.RESET}")
+            print(f"{yellow}Parameters:{reset}")
             new_params = {}
             for key, value in api_info["params"].items():
-                new_value = input(f"  {key} [{Colors.BRIGHT_WHITE}{value}{Colors.RESET}]: ").strip()
+                new_value = input(f"  {key} [{white}{value}{reset}]: ").strip()
                 new_params[key] = new_value if new_value else value
             api_info["params"] = new_params
 
         # Edit data (for POST/PUT)
         if api_info.get("data"):
             print()
-            print(f"{Colors.YELLOW}Request Data:{Colors.RESET}")
+            print(f"{yellow}Request Data:{reset}")
             new_data = {}
             for key, value in api_info["data"].items():
-                new_value = input(f"  {key} [{Colors.BRIGHT_WHITE}{value}{Colors.RESET}]: ").strip()
+                new_value = input(f"  {key} [{white}{value}{reset}]: ").strip()
                 new_data[key] = new_value if new_value else value
             api_info["data"] = new_data
+            api_info["_data_json"] = json.dumps(new_data, indent=2)
 
         print()
-        print(f"{Colors.GREEN}✓ Parameters updated{Colors.RESET}")
+        print(f"{Colors.GREEN}✓ Parameters updated{reset}")
 
         return api_info
 
@@ -299,6 +352,10 @@ class APICallConfirmation:
         Returns: (should_execute, final_tool_input, username)
         """
 
+        # Non-interactive runs skip preview rendering and prompting entirely
+        if self.settings.infoblox_auto_confirm:
+            return (True, tool_input, None)
+
         # Map tool to API details
         api_info = self.map_tool_to_api_call(tool_name, tool_input)
 
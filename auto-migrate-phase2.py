@@ -7,6 +7,7 @@ Migrates all Python files to use security modules
 import os
 import re
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Files to migrate
@@ -51,139 +52,127 @@ security_logger = get_security_logger()
 settings.display_security_warning()
 '''
 
-def backup_file(filepath):
-    """Backup original file"""
-    shutil.copy2(filepath, BACKUP_DIR / filepath.name)
-    print(f"✓ Backed up: {filepath.name}")
+# All patterns are ASCII, so migration runs on raw bytes and never
+# decodes/re-encodes the source files.
+_SECURITY_IMPORTS_BYTES = SECURITY_IMPORTS.encode()
 
-def remove_insecure_config(content):
-    """Remove hardcoded credentials and SSL suppression"""
+# Precompiled migration patterns: (pattern, replacement), applied in order
+_INSECURE_CONFIG_PATTERNS = [
     # Remove SSL warning suppression
-    content = re.sub(
-        r'requests\.packages\.urllib3\.disable_warnings\([^)]+\)\s*\n',
-        '',
-        content
-    )
-    content = re.sub(
-        r'from urllib3\.exceptions import InsecureRequestWarning\s*\n',
-        '',
-        content
-    )
+    (re.compile(rb'requests\.packages\.urllib3\.disable_warnings\([^)]+\)\s*\n'), b''),
+    (re.compile(rb'from urllib3\.exceptions import InsecureRequestWarning\s*\n'), b''),
 
     # Remove hardcoded credentials
-    content = re.sub(
-        r'INFOBLOX_HOST\s*=\s*os\.getenv\(["\']INFOBLOX_HOST["\'],\s*["\'][^"\']+["\']\)',
-        '# Configuration moved to config.py',
-        content
-    )
-    content = re.sub(
-        r'INFOBLOX_USER\s*=\s*os\.getenv\(["\']INFOBLOX_USER["\'],\s*["\'][^"\']+["\']\)',
-        '',
-        content
-    )
-    content = re.sub(
-        r'INFOBLOX_PASSWORD\s*=\s*os\.getenv\(["\']INFOBLOX_PASSWORD["\'],\s*["\'][^"\']+["\']\)',
-        '',
-        content
-    )
-    content = re.sub(
-        r'WAPI_VERSION\s*=\s*os\.getenv\(["\']WAPI_VERSION["\'],\s*["\'][^"\']+["\']\)',
-        '',
-        content
-    )
-    content = re.sub(
-        r'ANTHROPIC_API_KEY\s*=\s*os\.getenv\(["\']ANTHROPIC_API_KEY["\'],\s*["\'][^"\']+["\']\)',
-        '',
-        content
-    )
+    (re.compile(rb'INFOBLOX_HOST\s*=\s*os\.getenv\(["\']INFOBLOX_HOST["\'],\s*["\'][^"\']+["\']\)'),
+     b'# Configuration moved to config.py'),
+    (re.compile(rb'INFOBLOX_USER\s*=\s*os\.getenv\(["\']INFOBLOX_USER["\'],\s*["\'][^"\']+["\']\)'), b''),
+    (re.compile(rb'INFOBLOX_PASSWORD\s*=\s*os\.getenv\(["\']INFOBLOX_PASSWORD["\'],\s*["\'][^"\']+["\']\)'), b''),
+    (re.compile(rb'WAPI_VERSION\s*=\s*os\.getenv\(["\']WAPI_VERSION["\'],\s*["\'][^"\']+["\']\)'), b''),
+    (re.compile(rb'ANTHROPIC_API_KEY\s*=\s*os\.getenv\(["\']ANTHROPIC_API_KEY["\'],\s*["\'][^"\']+["\']\)'), b''),
 
     # Remove verify=False
-    content = re.sub(
-        r'\.verify\s*=\s*False',
-        '.verify = settings.get_ssl_verify()',
-        content
-    )
-    content = re.sub(
-        r'verify\s*=\s*False',
-        'verify=settings.get_ssl_verify()',
-        content
-    )
+    (re.compile(rb'\.verify\s*=\s*False'), b'.verify = settings.get_ssl_verify()'),
+    (re.compile(rb'verify\s*=\s*False'), b'verify=settings.get_ssl_verify()'),
+]
+
+# Config variable -> settings attribute
+_CONFIG_VAR_REPLACEMENTS = {
+    b'INFOBLOX_HOST': b'settings.infoblox_host',
+    b'INFOBLOX_USER': b'settings.infoblox_user',
+    b'INFOBLOX_PASSWORD': b'settings.infoblox_password',
+    b'WAPI_VERSION': b'settings.wapi_version',
+    b'ANTHROPIC_API_KEY': b'settings.anthropic_api_key',
+}
+_CONFIG_VAR_RE = re.compile(
+    rb'\b(' + b'|'.join(_CONFIG_VAR_REPLACEMENTS) + rb')\b(?!\s*=)'
+)
+
+_PRINT_RE = re.compile(rb'print\(f?"([^"]+)"\)')
+
+# Everything up to and including the first triple-quoted string
+_DOCSTRING_RE = re.compile(rb'\A.*?""".*?"""', re.DOTALL)
+
+def backup_file(filepath):
+    """Backup original file"""
+    # A hardlink is a single metadata operation; migrate_file writes the
+    # migrated content to a new inode so the linked original is kept.
+    # Fall back to copying if a backup already exists or linking is
+    # unsupported (e.g. across filesystems).
+    try:
+        os.link(filepath, BACKUP_DIR / filepath.name)
+    except OSError:
+        shutil.copy2(filepath, BACKUP_DIR / filepath.name)
+    print(f"✓ Backed up: {filepath.name}")
+
+def remove_insecure_config(content):
+    """Remove hardcoded credentials and SSL suppression"""
+    for pattern, replacement in _INSECURE_CONFIG_PATTERNS:
+        content = pattern.sub(replacement, content)
 
     return content
 
 def add_security_imports(content):
     """Add security imports after docstring"""
     # Find end of docstring
-    if '"""' in content:
-        parts = content.split('"""', 2)
-        if len(parts) >= 3:
-            return parts[0] + '"""' + parts[1] + '"""' + SECURITY_IMPORTS + parts[2]
+    m = _DOCSTRING_RE.match(content)
+    if m:
+        end = m.end()
+        return content[:end] + _SECURITY_IMPORTS_BYTES + content[end:]
 
     # If no docstring, add at beginning
-    return SECURITY_IMPORTS + content
+    return _SECURITY_IMPORTS_BYTES + content
 
 def replace_config_vars(content):
     """Replace config variables with settings"""
-    replacements = {
-        'INFOBLOX_HOST': 'settings.infoblox_host',
-        'INFOBLOX_USER': 'settings.infoblox_user',
-        'INFOBLOX_PASSWORD': 'settings.infoblox_password',
-        'WAPI_VERSION': 'settings.wapi_version',
-        'ANTHROPIC_API_KEY': 'settings.anthropic_api_key',
-    }
-
-    for old, new in replacements.items():
-        # Replace only standalone variable references, not in assignments
-        content = re.sub(
-            rf'\b{old}\b(?!\s*=)',
-            new,
-            content
-        )
-
-    return content
+    # Replace only standalone variable references, not in assignments
+    return _CONFIG_VAR_RE.sub(lambda m: _CONFIG_VAR_REPLACEMENTS[m.group(1)], content)
 
 def add_logging(content):
     """Add logging statements"""
     # Replace print statements with logging
-    content = re.sub(
-        r'print\(f?"([^"]+)"\)',
-        r'logger.info("\1")\n    print("\1")  # Keep print for console output',
+    return _PRINT_RE.sub(
+        rb'logger.info("\1")\n    print("\1")  # Keep print for console output',
         content
     )
 
-    return content
-
 def migrate_file(filepath):
-    """Migrate a single file"""
+    """Migrate a single file, returning (filename, success)"""
     print(f"\nMigrating: {filepath.name}")
     print("=" * 60)
 
-    # Backup
-    backup_file(filepath)
+    try:
+        # Backup
+        backup_file(filepath)
 
-    # Read file
-    with open(filepath, 'r') as f:
-        content = f.read()
+        # Read file
+        with open(filepath, 'rb') as f:
+            content = f.read()
 
-    # Apply migrations
-    print("  • Removing insecure configuration...")
-    content = remove_insecure_config(content)
+        # Apply migrations
+        print("  • Removing insecure configuration...")
+        content = remove_insecure_config(content)
 
-    print("  • Adding security imports...")
-    content = add_security_imports(content)
+        print("  • Adding security imports...")
+        content = add_security_imports(content)
 
-    print("  • Replacing config variables...")
-    content = replace_config_vars(content)
+        print("  • Replacing config variables...")
+        content = replace_config_vars(content)
 
-    print("  • Adding logging...")
-    content = add_logging(content)
+        print("  • Adding logging...")
+        content = add_logging(content)
 
-    # Write back
-    with open(filepath, 'w') as f:
-        f.write(content)
+        # Write back to a fresh inode; truncating in place would also
+        # overwrite a hardlinked backup
+        os.remove(filepath)
+        with open(filepath, 'wb') as f:
+            f.write(content)
+        shutil.copymode(BACKUP_DIR / filepath.name, filepath)
+    except Exception as e:
+        print(f"✗ Error migrating {filepath.name}: {e}")
+        return filepath.name, False
 
     print(f"✓ Migration complete: {filepath.name}")
-    return True
+    return filepath.name, True
 
 def main():
     print("=" * 60)
@@ -193,6 +182,7 @@ def main():
 
     migrated = []
     failed = []
+    to_migrate = []
 
     for filename in FILES_TO_MIGRATE:
         filepath = BASE_DIR / filename
@@ -202,12 +192,12 @@ def main():
             failed.append(filename)
             continue
 
-        try:
-            if migrate_file(filepath):
-                migrated.append(filename)
-        except Exception as e:
-            print(f"✗ Error migrating {filename}: {e}")
-            failed.append(filename)
+        to_migrate.append(filepath)
+
+    # Files are independent, so migrate them across CPU cores
+    with ProcessPoolExecutor() as executor:
+        for filename, success in executor.map(migrate_file, to_migrate):
+            (migrated if success else failed).append(filename)
 
     # Summary
     print()
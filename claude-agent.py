@@ -4,8 +4,75 @@
 import os
 import sys
 import json
-import subprocess
-import anthropic
+import signal
+import threading
+import time
+
+# Claude model used for interactive and batch requests
+MODEL = "claude-sonnet-4-5-20250929"
+
+# Number of most recent user/assistant exchanges sent to Claude each turn
+MAX_HISTORY_TURNS = 20
+
+# Seconds before a running command is killed
+COMMAND_TIMEOUT = 30
+
+# Seconds between status checks while a message batch is processing
+BATCH_POLL_INTERVAL = 10
+
+# Accepted answers to permission prompts
+_YES = frozenset({'y', 'yes'})
+_NO = frozenset({'n', 'no'})
+
+# Tool definitions sent with every request; built once at import
+TOOLS = [
+    {
+        "name": "write_file",
+        "description": "Write content to a file on the user's system. Always ask user for permission before writing files.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "The path where the file should be written (can be relative or absolute)"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "The content to write to the file"
+                }
+            },
+            "required": ["file_path", "content"]
+        }
+    },
+    {
+        "name": "read_file",
+        "description": "Read content from a file on the user's system",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "The path of the file to read"
+                }
+            },
+            "required": ["file_path"]
+        }
+    },
+    {
+        "name": "execute_command",
+        "description": "Execute a shell command on the user's system. Always explain what the command does and ask for permission. Use with caution.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "The shell command to execute"
+                }
+            },
+            "required": ["command"]
+        }
+    }
+]
 
 def ask_permission(action, details):
     """Ask user for permission before taking action"""
@@ -17,9 +84,9 @@ def ask_permission(action, details):
 
     while True:
         response = input("Allow this action? (yes/no): ").strip().lower()
-        if response in ['yes', 'y']:
+        if response in _YES:
             return True
-        elif response in ['no', 'n']:
+        elif response in _NO:
             return False
         else:
             print("Please answer 'yes' or 'no'")
@@ -49,22 +116,50 @@ def write_file(file_path, content):
         print("\n🚫 File write cancelled by user\n")
         return False
 
+def _kill_process_group(proc):
+    """Kill a command started in its own session, including its children"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
 def execute_command(command):
     """Execute a shell command with user permission"""
     details = f"Command: {command}\n"
     details += f"\n⚠️  WARNING: This will execute on your system!"
 
     if ask_permission("Execute Command", details):
+        # Deferred until a command is actually approved
+        import subprocess
+
         try:
-            result = subprocess.run(
+            # Stream output as it is produced while collecting it for Claude
+            proc = subprocess.Popen(
                 command,
                 shell=True,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=30
+                bufsize=1,
+                start_new_session=True
             )
-            output = result.stdout + result.stderr
-            print(f"\n📋 Command output:\n{'-'*80}\n{output}\n{'-'*80}\n")
+            timer = threading.Timer(COMMAND_TIMEOUT, _kill_process_group, args=(proc,))
+            chunks = []
+            print(f"\n📋 Command output:\n{'-'*80}")
+            timer.start()
+            try:
+                for line in proc.stdout:
+                    sys.stdout.write(line)
+                    chunks.append(line)
+                proc.wait()
+                timed_out = timer.finished.is_set()
+            finally:
+                timer.cancel()
+                proc.stdout.close()
+            if timed_out:
+                chunks.append(f"\n[Command timed out after {COMMAND_TIMEOUT} seconds]\n")
+            output = "".join(chunks)
+            print(f"\n{'-'*80}\n")
             return output
         except Exception as e:
             print(f"\n❌ Error executing command: {e}\n")
@@ -97,6 +192,72 @@ def process_tool_call(tool_name, tool_input):
 
     return {"error": "Unknown tool"}
 
+def trim_history(conversation_history):
+    """
+    Drop the oldest messages so at most MAX_HISTORY_TURNS exchanges are sent.
+
+    Trimming happens in place and always resumes at a plain user prompt, so
+    the history never starts with an orphaned tool_result.
+    """
+    excess = len(conversation_history) - 2 * MAX_HISTORY_TURNS
+    if excess <= 0:
+        return
+
+    for cut in range(excess, len(conversation_history)):
+        message = conversation_history[cut]
+        if message["role"] == "user" and isinstance(message["content"], str):
+            del conversation_history[:cut]
+            return
+
+def run_batch(client, prompts_file):
+    """
+    Answer one prompt per line of prompts_file using the Message Batches API.
+
+    Batches are processed asynchronously at a reduced token rate, so this
+    suits offline workloads. Tools are not offered because they need
+    interactive permission.
+    """
+    with open(prompts_file, 'r') as f:
+        prompts = [line.strip() for line in f if line.strip()]
+
+    if not prompts:
+        print(f"No prompts found in {prompts_file}")
+        return
+
+    batch = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": f"prompt-{i}",
+                "params": {
+                    "model": MODEL,
+                    "max_tokens": 4096,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+            }
+            for i, prompt in enumerate(prompts)
+        ]
+    )
+    print(f"📦 Submitted batch {batch.id} with {len(prompts)} prompts")
+
+    while batch.processing_status != "ended":
+        time.sleep(BATCH_POLL_INTERVAL)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    # Results are not guaranteed to come back in submission order
+    answers = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            answers[entry.custom_id] = "".join(
+                block.text for block in entry.result.message.content if block.type == "text"
+            )
+        else:
+            answers[entry.custom_id] = f"Error: request {entry.result.type}"
+
+    for i, prompt in enumerate(prompts):
+        print("=" * 80)
+        print(f"You: {prompt}")
+        print(f"\nClaude: {answers.get(f'prompt-{i}', 'Error: no result returned')}\n")
+
 def main():
     # Get API key from environment variable
     api_key = os.environ.get('ANTHROPIC_API_KEY')
@@ -105,58 +266,16 @@ def main():
         print('Error: ANTHROPIC_API_KEY environment variable not set', file=sys.stderr)
         sys.exit(1)
 
+    # Imported here so startup stays fast and a missing key fails immediately
+    import anthropic
+
     # Create Anthropic client
     client = anthropic.Anthropic(api_key=api_key)
 
-    # Define available tools
-    tools = [
-        {
-            "name": "write_file",
-            "description": "Write content to a file on the user's system. Always ask user for permission before writing files.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "file_path": {
-                        "type": "string",
-                        "description": "The path where the file should be written (can be relative or absolute)"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "The content to write to the file"
-                    }
-                },
-                "required": ["file_path", "content"]
-            }
-        },
-        {
-            "name": "read_file",
-            "description": "Read content from a file on the user's system",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "file_path": {
-                        "type": "string",
-                        "description": "The path of the file to read"
-                    }
-                },
-                "required": ["file_path"]
-            }
-        },
-        {
-            "name": "execute_command",
-            "description": "Execute a shell command on the user's system. Always explain what the command does and ask for permission. Use with caution.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The shell command to execute"
-                    }
-                },
-                "required": ["command"]
-            }
-        }
-    ]
+    # Non-interactive batch mode: claude-agent.py --batch prompts.txt
+    if len(sys.argv) == 3 and sys.argv[1] == '--batch':
+        run_batch(client, sys.argv[2])
+        return
 
     # Conversation history
     conversation_history = []
@@ -210,50 +329,48 @@ def main():
                 print("\nClaude: ", end='', flush=True)
 
                 # Send message to Claude with tools
+                trim_history(conversation_history)
                 response = client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
+                    model=MODEL,
                     max_tokens=4096,
-                    tools=tools,
+                    tools=TOOLS,
                     messages=conversation_history
                 )
 
-                # Process the response
+                # Process the response; every tool_use block in this turn is
+                # answered in a single follow-up user message
                 assistant_message = {"role": "assistant", "content": []}
+                tool_results = []
 
                 for block in response.content:
+                    assistant_message["content"].append(block)
+
                     if block.type == "text":
                         print(block.text, end='', flush=True)
-                        assistant_message["content"].append(block)
 
                     elif block.type == "tool_use":
-                        # Add tool use to message
-                        assistant_message["content"].append(block)
-
                         # Process the tool call
                         print(f"\n\n🔧 Using tool: {block.name}")
                         result = process_tool_call(block.name, block.input)
-
-                        # Add assistant message with tool use
-                        conversation_history.append(assistant_message)
-
-                        # Add tool result
-                        conversation_history.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": json.dumps(result)
-                            }]
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": block.id,
+                            "content": json.dumps(result)
                         })
 
-                        # Continue the loop to get Claude's response to the tool result
-                        break
-                else:
+                conversation_history.append(assistant_message)
+
+                if not tool_results:
                     # No tool use, end the loop
-                    conversation_history.append(assistant_message)
                     print("\n")
                     break
 
+                # Add tool results and get Claude's response to them
+                conversation_history.append({
+                    "role": "user",
+                    "content": tool_results
+                })
+
             except Exception as e:
                 print(f'\nError: {e}', file=sys.stderr)
                 conversation_history.pop()
@@ -2,7 +2,7 @@
 """Interactive chat interface for Claude AI with InfoBlox WAPI integration"""
 
 # Import security modules
-from config import get_settings, ConfigurationError
+from config import get_settings, ConfigurationError, SSLContextAdapter
 from logging_config import setup_logging, get_security_logger
 from validators import InputValidator, ValidationError
 from api_confirmation import api_confirmation
@@ -33,20 +33,44 @@ settings.display_security_warning()
 
 import os
 import sys
-import anthropic
 import textwrap
+import threading
+import time
 import json
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial, wraps
+import shlex
 import subprocess
 import glob
+from itertools import islice
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+# Web search/parsing libraries are imported on first use by
+# _load_web_libraries; None means they have not been probed yet
+WEB_SEARCH_AVAILABLE = None
+DDGS = None
+BeautifulSoup = None
+HTML_PARSER = 'html.parser'
+
+# orjson serializes large WAPI results much faster than the json module
 try:
-    from duckduckgo_search import DDGS
-    from bs4 import BeautifulSoup
-    WEB_SEARCH_AVAILABLE = True
+    import orjson
 except ImportError:
-    WEB_SEARCH_AVAILABLE = False
+    orjson = None
+
+# Only the start of a page is parsed; the text is truncated to 5000 chars anyway
+MAX_FETCH_BYTES = 200_000
+
+# Characters that need a shell: operators, expansions, globs, comments
+_SHELL_SYNTAX_RE = re.compile(r'[|&;<>()$`\\*?\[\]{}~!#\n]|^\s*\w+=')
+
+# Collapses whitespace runs in extracted page text
+_WS_RE = re.compile(r'\s+')
 
 # InfoBlox Configuration moved to config.py
 BASE_URL = settings.get_infoblox_base_url()
@@ -74,6 +98,11 @@ class Colors:
     BRIGHT_WHITE = '\033[97m'
 
 
+# Chat prompts, rendered once
+USER_PROMPT = f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+ASSISTANT_PROMPT = f"\n{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} "
+
+
 class InfoBloxClient:
     """Client for InfoBlox WAPI"""
 
@@ -86,6 +115,22 @@ class InfoBloxClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         })
+        # Larger keep-alive pool for back-to-back WAPI calls; retry transient
+        # gateway errors (idempotent methods only, so POSTs are never replayed)
+        adapter_kwargs = dict(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False  # hand the final response to wapi_request
+            )
+        )
+        # Connections share one SSL context, so a CA bundle is parsed once
+        adapter = SSLContextAdapter(settings.get_ssl_context(), **adapter_kwargs)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def wapi_request(self, method: str, path: str, **kwargs):
         """Make WAPI request"""
@@ -97,11 +142,14 @@ class InfoBloxClient:
                 logger.warning(f"InfoBlox API error: HTTP {response.status_code}")
                 return {"error": f"HTTP {response.status_code}", "details": response.text}
 
-            if not response.text or response.text.strip() == "":
+            if not response.content.strip():
                 logger.info(f"InfoBlox API success: {method} {path}")
                 return {"success": True, "message": "Operation completed successfully"}
 
             logger.info(f"InfoBlox API success: {method} {path}")
+            if orjson is not None:
+                # Parses the raw bytes directly, skipping the text decode
+                return orjson.loads(response.content)
             return response.json()
         except Exception as e:
             logger.error(f"InfoBlox API error: {e}", exc_info=True)
@@ -111,6 +159,13 @@ class InfoBloxClient:
 # Global InfoBlox client
 infoblox_client = InfoBloxClient()
 
+# Shared session for web fetches so repeat hosts reuse pooled connections
+WEB_SESSION = requests.Session()
+WEB_SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
+_web_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+WEB_SESSION.mount('http://', _web_adapter)
+WEB_SESSION.mount('https://', _web_adapter)
+
 
 def print_header():
     """Print styled header"""
@@ -137,29 +192,67 @@ def print_header():
     print()
 
 
-def print_user_prompt():
-    return f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+def print_assistant_prompt():
+    sys.stdout.write(ASSISTANT_PROMPT)
+    sys.stdout.flush()
 
 
-def print_assistant_prompt():
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} ", end='', flush=True)
+# Shared wrapper so its settings and regexes are set up once
+_WRAPPER = textwrap.TextWrapper(width=75, break_long_words=False, break_on_hyphens=False)
 
 
 def print_message(text, is_user=False):
-    width = 75
-    color = Colors.BRIGHT_WHITE
-    wrapped = textwrap.fill(text, width=width, break_long_words=False, break_on_hyphens=False)
-    for line in wrapped.split('\n'):
-        print(f"{color}{line}{Colors.RESET}")
+    # Bind colors locally; this runs for every streamed line
+    color, reset = Colors.BRIGHT_WHITE, Colors.RESET
+    if len(text) <= _WRAPPER.width:
+        # Already fits; skip TextWrapper's regex splitting
+        lines = [text.rstrip()]
+    else:
+        lines = _WRAPPER.wrap(text) or ['']
+    sys.stdout.write("".join(f"{color}{line}{reset}\n" for line in lines))
+
+
+def dump_tool_result(result):
+    """Serialize a tool result for the tool_result message"""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result)
 
 
-def print_thinking():
-    print(f"{Colors.DIM}{Colors.BRIGHT_BLACK}  (thinking...){Colors.RESET}", end='', flush=True)
+# Read-only lookups are reused for this many seconds, up to this many entries
+LOOKUP_CACHE_TTL = 60
+LOOKUP_CACHE_SIZE = 256
 
 
-def clear_line():
-    print('\r\033[K', end='', flush=True)
+def ttl_cached(func):
+    """
+    Memoize a read-only lookup for LOOKUP_CACHE_TTL seconds, keeping the
+    LOOKUP_CACHE_SIZE most recently used results. Errors are not cached.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = json.dumps([args, kwargs], sort_keys=True, default=str)
+        now = time.monotonic()
+        with lock:
+            hit = cache.get(key)
+            if hit is not None and now - hit[0] < LOOKUP_CACHE_TTL:
+                cache.move_to_end(key)
+                return hit[1]
+
+        result = func(*args, **kwargs)
+        if not (isinstance(result, dict) and "error" in result):
+            with lock:
+                cache[key] = (now, result)
+                cache.move_to_end(key)
+                if len(cache) > LOOKUP_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
 
 
 # Built-in tool functions
@@ -183,15 +276,44 @@ def execute_simple_command(command):
             return f"Error: Invalid command - {e}"
 
         logger.info(f"Executing command: {command}")
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=10)
-        return result.stdout + result.stderr
+        # Plain commands are exec'd directly; only shell syntax needs /bin/sh
+        args = None if _SHELL_SYNTAX_RE.search(command) else shlex.split(command)
+        try:
+            result = subprocess.run(
+                args or command, shell=args is None, capture_output=True, timeout=10, check=False
+            )
+        except FileNotFoundError:
+            # Not an executable (e.g. a shell builtin); let the shell handle it
+            result = subprocess.run(command, shell=True, capture_output=True, timeout=10, check=False)
+        return (result.stdout + result.stderr).decode(errors='replace')
     except Exception as e:
         logger.error(f"Command execution error: {e}", exc_info=True)
         return f"Error: {e}"
 
 
+def _load_web_libraries():
+    """Import the web search/parsing libraries once, reporting availability"""
+    global WEB_SEARCH_AVAILABLE, DDGS, BeautifulSoup, HTML_PARSER
+    if WEB_SEARCH_AVAILABLE is None:
+        try:
+            from duckduckgo_search import DDGS
+            from bs4 import BeautifulSoup
+            WEB_SEARCH_AVAILABLE = True
+        except ImportError:
+            WEB_SEARCH_AVAILABLE = False
+
+        # Prefer the C-based lxml parser for fetched pages when it is installed
+        try:
+            import lxml  # noqa: F401
+            HTML_PARSER = 'lxml'
+        except ImportError:
+            pass
+    return WEB_SEARCH_AVAILABLE
+
+
+@ttl_cached
 def web_search(query, max_results=5):
-    if not WEB_SEARCH_AVAILABLE:
+    if not _load_web_libraries():
         return {"error": "Web search not available"}
     try:
         with DDGS() as ddgs:
@@ -202,19 +324,28 @@ def web_search(query, max_results=5):
 
 
 def fetch_webpage(url):
-    if not WEB_SEARCH_AVAILABLE:
+    if not _load_web_libraries():
         return {"error": "Web fetching not available"}
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with WEB_SESSION.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            raw = response.raw.read(MAX_FETCH_BYTES, decode_content=True)
+            content_type = response.headers.get('Content-Type', '')
+
+        # JSON APIs need no HTML parsing; re-encode compactly when complete
+        if 'json' in content_type:
+            try:
+                text = dump_tool_result(orjson.loads(raw) if orjson is not None else json.loads(raw))
+            except ValueError:
+                text = raw.decode(errors='replace')
+            if len(text) > 5000:
+                text = text[:5000] + "...[truncated]"
+            return {"url": url, "content": text, "title": url}
+
+        soup = BeautifulSoup(raw, HTML_PARSER)
         for script in soup(["script", "style"]):
             script.decompose()
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
+        text = _WS_RE.sub(' ', soup.get_text(separator=' ')).strip()
         if len(text) > 5000:
             text = text[:5000] + "...[truncated]"
         return {"url": url, "content": text, "title": soup.title.string if soup.title else "No title"}
@@ -224,16 +355,19 @@ def fetch_webpage(url):
 
 def search_files(pattern, directory="."):
     try:
-        files = glob.glob(os.path.join(directory, "**", pattern), recursive=True)
-        return {"files": files[:50], "pattern": pattern, "directory": directory}
+        # iglob walks lazily, so the walk stops once 50 matches are found
+        matches = glob.iglob(os.path.join(directory, "**", pattern), recursive=True)
+        files = list(islice(matches, 50))
+        return {"files": files, "pattern": pattern, "directory": directory}
     except Exception as e:
         return {"error": str(e)}
 
 
 def read_file_content(file_path):
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        # Read one char past the limit so truncation can still be detected
+        with open(file_path, 'r', errors='replace') as f:
+            content = f.read(10001)
         if len(content) > 10000:
             content = content[:10000] + "...[truncated]"
         return {"file_path": file_path, "content": content}
@@ -242,6 +376,7 @@ def read_file_content(file_path):
 
 
 # InfoBlox WAPI tools
+@ttl_cached
 def infoblox_list_networks(max_results=100, return_fields=""):
     """List networks from InfoBlox"""
     params = {"_max_results": max_results}
@@ -250,6 +385,7 @@ def infoblox_list_networks(max_results=100, return_fields=""):
     return infoblox_client.wapi_request("GET", "network", params=params)
 
 
+@ttl_cached
 def infoblox_get_network(ref, return_fields=""):
     """Get specific network by reference"""
     params = {}
@@ -264,7 +400,9 @@ def infoblox_create_network(network, comment="", **kwargs):
     if comment:
         data["comment"] = comment
     data.update(kwargs)
-    return infoblox_client.wapi_request("POST", "network", json=data)
+    result = infoblox_client.wapi_request("POST", "network", json=data)
+    clear_infoblox_caches()
+    return result
 
 
 def infoblox_search_records(record_type, name="", value="", max_results=100):
@@ -287,6 +425,7 @@ def infoblox_list_dhcp_leases(network="", mac="", max_results=100):
     return infoblox_client.wapi_request("GET", "lease", params=params)
 
 
+@ttl_cached
 def infoblox_generic_query(object_type, filters=None, max_results=100):
     """Generic InfoBlox query"""
     params = {"_max_results": max_results}
@@ -295,24 +434,100 @@ def infoblox_generic_query(object_type, filters=None, max_results=100):
     return infoblox_client.wapi_request("GET", object_type, params=params)
 
 
-def process_tool_call(tool_name, tool_input):
-    """Process tool calls with user confirmation for InfoBlox APIs"""
+def clear_infoblox_caches():
+    """Forget cached InfoBlox lookups after a write or a credential change"""
+    infoblox_list_networks.cache_clear()
+    infoblox_get_network.cache_clear()
+    infoblox_generic_query.cache_clear()
+
+
+def _find_network_detailed(tool_input):
+    from network_info import NetworkInfoClient
+    client = NetworkInfoClient()
+    result = client.find_network_detailed(tool_input.get("network"))
+    # Return formatted output
+    return {"output": client.format_output(result), "raw_data": result}
+
+
+def _find_ip_detailed(tool_input):
+    from ip_info import IPInfoClient
+    client = IPInfoClient()
+    result = client.find_ip_detailed(tool_input.get("ip_address"))
+    # Return formatted output
+    return {"output": client.format_output(result), "raw_data": result}
+
+
+def _find_zone_detailed(tool_input):
+    from zone_info import ZoneInfoClient
+    client = ZoneInfoClient()
+    result = client.find_zone_detailed(tool_input.get("zone_name"))
+    # Return formatted output
+    return {"output": client.format_output(result), "raw_data": result}
+
+
+# InfoBlox tools require user confirmation before they run
+INFOBLOX_TOOLS = frozenset({
+    "infoblox_list_networks", "infoblox_get_network", "infoblox_create_network",
+    "infoblox_search_records", "infoblox_list_dhcp_leases", "infoblox_query",
+    "infoblox_find_network_detailed", "infoblox_find_ip_detailed", "infoblox_find_zone_detailed"
+})
+
+# Tool name -> handler taking the tool input dict
+_TOOL_HANDLERS = {
+    # InfoBlox tools - execute after confirmation
+    "infoblox_list_networks": lambda t: infoblox_list_networks(
+        t.get("max_results", 100), t.get("return_fields", "")
+    ),
+    "infoblox_get_network": lambda t: infoblox_get_network(t.get("ref"), t.get("return_fields", "")),
+    "infoblox_create_network": lambda t: infoblox_create_network(**t),
+    "infoblox_search_records": lambda t: infoblox_search_records(**t),
+    "infoblox_list_dhcp_leases": lambda t: infoblox_list_dhcp_leases(**t),
+    "infoblox_query": lambda t: infoblox_generic_query(**t),
+    "infoblox_find_network_detailed": _find_network_detailed,
+    "infoblox_find_ip_detailed": _find_ip_detailed,
+    "infoblox_find_zone_detailed": _find_zone_detailed,
+
+    # Built-in tools - execute immediately (no confirmation needed)
+    "get_current_datetime": lambda t: get_current_datetime(),
+    "execute_command": lambda t: {"output": execute_simple_command(t.get("command"))},
+    "web_search": lambda t: web_search(t.get("query"), t.get("max_results", 5)),
+    "fetch_webpage": lambda t: fetch_webpage(t.get("url")),
+    "search_files": lambda t: search_files(t.get("pattern"), t.get("directory", ".")),
+    "read_file": lambda t: read_file_content(t.get("file_path")),
+}
+
+
+# Tools that wait on the network; these run concurrently within a turn
+_NETWORK_TOOLS = INFOBLOX_TOOLS | {"web_search", "fetch_webpage"}
+
+# Upper bound on concurrent network tool calls in one turn
+MAX_TOOL_WORKERS = 8
+
+# Number of most recent user/assistant exchanges sent to Claude each turn
+MAX_HISTORY_TURNS = 20
+
+
+def prepare_tool_call(tool_name, tool_input):
+    """
+    Log and confirm a tool call, returning a zero-argument callable that runs it.
+
+    Confirmation prompts happen here, in order, so the returned callables
+    can be run concurrently.
+    """
     logger.info(f"Tool called: {tool_name}")
     security_logger.info(f"TOOL_EXECUTION - Tool: {tool_name}, Input: {json.dumps(tool_input, default=str)}")
 
-    # Check if this is an InfoBlox tool - require confirmation
-    infoblox_tools = [
-        "infoblox_list_networks", "infoblox_get_network", "infoblox_create_network",
-        "infoblox_search_records", "infoblox_list_dhcp_leases", "infoblox_query",
-        "infoblox_find_network_detailed", "infoblox_find_ip_detailed", "infoblox_find_zone_detailed"
-    ]
+    handler = _TOOL_HANDLERS.get(tool_name)
+    if handler is None:
+        return lambda: {"error": "Unknown tool"}
 
-    if tool_name in infoblox_tools:
+    # Check if this is an InfoBlox tool - require confirmation
+    if tool_name in INFOBLOX_TOOLS:
         # Show API preview and get user confirmation
         should_execute, final_input, username = api_confirmation.confirm_api_call(tool_name, tool_input)
 
         if not should_execute:
-            return {"cancelled": True, "message": "API call cancelled by user"}
+            return lambda: {"cancelled": True, "message": "API call cancelled by user"}
 
         # Use modified input from confirmation
         tool_input = final_input
@@ -320,231 +535,229 @@ def process_tool_call(tool_name, tool_input):
         # Update InfoBlox client username if changed
         if username:
             infoblox_client.session.auth = (username, settings.infoblox_password)
+            clear_infoblox_caches()
+
+    return partial(handler, tool_input)
+
+
+def run_tool_calls(tool_uses):
+    """
+    Run every tool_use block from one response, returning tool_result blocks
+    in the same order. Network-bound calls overlap their I/O on a thread pool.
+    """
+    calls = [prepare_tool_call(block.name, block.input) for block in tool_uses]
+    network = [i for i, block in enumerate(tool_uses) if block.name in _NETWORK_TOOLS]
+
+    results = [None] * len(calls)
+    if len(network) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(network))) as executor:
+            futures = {i: executor.submit(calls[i]) for i in network}
+            for i, call in enumerate(calls):
+                if i not in futures:
+                    results[i] = call()
+            for i, future in futures.items():
+                results[i] = future.result()
+    else:
+        results = [call() for call in calls]
 
-    # InfoBlox tools - execute after confirmation
-    if tool_name == "infoblox_list_networks":
-        return infoblox_list_networks(
-            tool_input.get("max_results", 100),
-            tool_input.get("return_fields", "")
-        )
-    elif tool_name == "infoblox_get_network":
-        return infoblox_get_network(
-            tool_input.get("ref"),
-            tool_input.get("return_fields", "")
-        )
-    elif tool_name == "infoblox_create_network":
-        return infoblox_create_network(**tool_input)
-    elif tool_name == "infoblox_search_records":
-        return infoblox_search_records(**tool_input)
-    elif tool_name == "infoblox_list_dhcp_leases":
-        return infoblox_list_dhcp_leases(**tool_input)
-    elif tool_name == "infoblox_query":
-        return infoblox_generic_query(**tool_input)
-    elif tool_name == "infoblox_find_network_detailed":
-        from network_info import NetworkInfoClient
-        client = NetworkInfoClient()
-        result = client.find_network_detailed(tool_input.get("network"))
-        # Return formatted output
-        return {"output": client.format_output(result), "raw_data": result}
-    elif tool_name == "infoblox_find_ip_detailed":
-        from ip_info import IPInfoClient
-        client = IPInfoClient()
-        result = client.find_ip_detailed(tool_input.get("ip_address"))
-        # Return formatted output
-        return {"output": client.format_output(result), "raw_data": result}
-    elif tool_name == "infoblox_find_zone_detailed":
-        from zone_info import ZoneInfoClient
-        client = ZoneInfoClient()
-        result = client.find_zone_detailed(tool_input.get("zone_name"))
-        # Return formatted output
-        return {"output": client.format_output(result), "raw_data": result}
-
-    # Built-in tools - execute immediately (no confirmation needed)
-    elif tool_name == "get_current_datetime":
-        return get_current_datetime()
-    elif tool_name == "execute_command":
-        return {"output": execute_simple_command(tool_input.get("command"))}
-    elif tool_name == "web_search":
-        return web_search(tool_input.get("query"), tool_input.get("max_results", 5))
-    elif tool_name == "fetch_webpage":
-        return fetch_webpage(tool_input.get("url"))
-    elif tool_name == "search_files":
-        return search_files(tool_input.get("pattern"), tool_input.get("directory", "."))
-    elif tool_name == "read_file":
-        return read_file_content(tool_input.get("file_path"))
-
-    return {"error": "Unknown tool"}
-
-
-def get_all_tools():
-    """Get all tool definitions"""
     return [
-        # Built-in tools
-        {
-            "name": "get_current_datetime",
-            "description": "Get the current date and time",
-            "input_schema": {"type": "object", "properties": {}, "required": []}
-        },
         {
-            "name": "web_search",
-            "description": "Search the web using DuckDuckGo",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string"},
-                    "max_results": {"type": "integer", "default": 5}
-                },
-                "required": ["query"]
-            }
-        },
-        {
-            "name": "fetch_webpage",
-            "description": "Fetch and read webpage content",
-            "input_schema": {
-                "type": "object",
-                "properties": {"url": {"type": "string"}},
-                "required": ["url"]
-            }
-        },
-        {
-            "name": "search_files",
-            "description": "Search for files by pattern",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "pattern": {"type": "string"},
-                    "directory": {"type": "string", "default": "."}
-                },
-                "required": ["pattern"]
-            }
-        },
-        {
-            "name": "read_file",
-            "description": "Read file contents",
-            "input_schema": {
-                "type": "object",
-                "properties": {"file_path": {"type": "string"}},
-                "required": ["file_path"]
-            }
-        },
-        {
-            "name": "execute_command",
-            "description": "Execute shell command",
-            "input_schema": {
-                "type": "object",
-                "properties": {"command": {"type": "string"}},
-                "required": ["command"]
-            }
-        },
-        # InfoBlox tools
-        {
-            "name": "infoblox_list_networks",
-            "description": "List networks from InfoBlox WAPI. Returns network objects with their IP ranges, comments, and configuration.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "max_results": {"type": "integer", "description": "Max results (default: 100)", "default": 100},
-                    "return_fields": {"type": "string", "description": "Comma-separated fields to return"}
-                }
-            }
-        },
-        {
-            "name": "infoblox_get_network",
-            "description": "Get a specific network object by its reference (_ref). Use this after listing to get detailed information.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "ref": {"type": "string", "description": "Network object reference (_ref)"},
-                    "return_fields": {"type": "string", "description": "Fields to return"}
-                },
-                "required": ["ref"]
-            }
-        },
-        {
-            "name": "infoblox_create_network",
-            "description": "Create a new network in InfoBlox. Requires network in CIDR format (e.g., 10.0.0.0/24).",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "network": {"type": "string", "description": "Network in CIDR format"},
-                    "comment": {"type": "string", "description": "Network comment/description"}
-                },
-                "required": ["network"]
-            }
-        },
-        {
-            "name": "infoblox_search_records",
-            "description": "Search DNS records by type and filters. Supports A, AAAA, PTR, CNAME, MX, TXT, SRV records.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "record_type": {"type": "string", "description": "Record type (a, aaaa, ptr, cname, mx, txt, srv)"},
-                    "name": {"type": "string", "description": "DNS name to search for"},
-                    "value": {"type": "string", "description": "IP address or value to search for"},
-                    "max_results": {"type": "integer", "default": 100}
-                },
-                "required": ["record_type"]
-            }
-        },
-        {
-            "name": "infoblox_list_dhcp_leases",
-            "description": "List DHCP leases from InfoBlox. Can filter by network or MAC address.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "network": {"type": "string", "description": "Filter by network (e.g., 10.0.0.0/24)"},
-                    "mac": {"type": "string", "description": "Filter by MAC address"},
-                    "max_results": {"type": "integer", "default": 100}
-                }
-            }
-        },
-        {
-            "name": "infoblox_query",
-            "description": "Generic InfoBlox WAPI query for any object type. Use for advanced queries of any InfoBlox object (zone_auth, fixedaddress, range, etc.).",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "object_type": {"type": "string", "description": "InfoBlox object type (e.g., zone_auth, fixedaddress, range)"},
-                    "filters": {"type": "object", "description": "Filter criteria as key-value pairs"},
-                    "max_results": {"type": "integer", "default": 100}
-                },
-                "required": ["object_type"]
-            }
-        },
-        {
-            "name": "infoblox_find_network_detailed",
-            "description": "Find network with comprehensive details for operations teams. Returns network info, container, extensible attributes, IP statistics (total/used/free), gateway, DHCP config. Use this for 'find network' or 'show network details' queries.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "network": {"type": "string", "description": "Network in CIDR notation (e.g., 192.168.1.0/24)"}
-                },
-                "required": ["network"]
-            }
-        },
-        {
-            "name": "infoblox_find_ip_detailed",
-            "description": "Find IP address with comprehensive details for operations teams. Returns allocation status (fixed/DHCP/available), MAC address, hostname, network info, DNS records (A/PTR with last queried time), DHCP status. Use for 'find IP' or 'show IP details' queries.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "ip_address": {"type": "string", "description": "IP address (e.g., 192.168.1.50)"}
-                },
-                "required": ["ip_address"]
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": dump_tool_result(result)
+        }
+        for block, result in zip(tool_uses, results)
+    ]
+
+
+def trim_history(conversation_history):
+    """
+    Drop the oldest messages so at most MAX_HISTORY_TURNS exchanges are sent.
+
+    Trimming happens in place and always resumes at a plain user prompt, so
+    the history never starts with an orphaned tool_result. Returns how many
+    messages were dropped.
+    """
+    excess = len(conversation_history) - 2 * MAX_HISTORY_TURNS
+    if excess <= 0:
+        return 0
+
+    for cut in range(excess, len(conversation_history)):
+        message = conversation_history[cut]
+        if message["role"] == "user" and isinstance(message["content"], str):
+            del conversation_history[:cut]
+            return cut
+    return 0
+
+
+# Tool definitions sent with every request; built once at import
+TOOLS = [
+    # Built-in tools
+    {
+        "name": "get_current_datetime",
+        "description": "Get the current date and time",
+        "input_schema": {"type": "object", "properties": {}, "required": []}
+    },
+    {
+        "name": "web_search",
+        "description": "Search the web using DuckDuckGo",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "max_results": {"type": "integer", "default": 5}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "fetch_webpage",
+        "description": "Fetch and read webpage content",
+        "input_schema": {
+            "type": "object",
+            "properties": {"url": {"type": "string"}},
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "search_files",
+        "description": "Search for files by pattern",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string"},
+                "directory": {"type": "string", "default": "."}
+            },
+            "required": ["pattern"]
+        }
+    },
+    {
+        "name": "read_file",
+        "description": "Read file contents",
+        "input_schema": {
+            "type": "object",
+            "properties": {"file_path": {"type": "string"}},
+            "required": ["file_path"]
+        }
+    },
+    {
+        "name": "execute_command",
+        "description": "Execute shell command",
+        "input_schema": {
+            "type": "object",
+            "properties": {"command": {"type": "string"}},
+            "required": ["command"]
+        }
+    },
+    # InfoBlox tools
+    {
+        "name": "infoblox_list_networks",
+        "description": "List networks from InfoBlox WAPI. Returns network objects with their IP ranges, comments, and configuration.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "max_results": {"type": "integer", "description": "Max results (default: 100)", "default": 100},
+                "return_fields": {"type": "string", "description": "Comma-separated fields to return"}
             }
-        },
-        {
-            "name": "infoblox_find_zone_detailed",
-            "description": "Find DNS zone with comprehensive details for operations teams. Returns zone type, NS group with name servers, subzones list, SOA configuration, record statistics by type, extensible attributes. Use for 'find zone' or 'show zone details' queries.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "zone_name": {"type": "string", "description": "Zone FQDN (e.g., corp.local or example.com)"}
-                },
-                "required": ["zone_name"]
+        }
+    },
+    {
+        "name": "infoblox_get_network",
+        "description": "Get a specific network object by its reference (_ref). Use this after listing to get detailed information.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ref": {"type": "string", "description": "Network object reference (_ref)"},
+                "return_fields": {"type": "string", "description": "Fields to return"}
+            },
+            "required": ["ref"]
+        }
+    },
+    {
+        "name": "infoblox_create_network",
+        "description": "Create a new network in InfoBlox. Requires network in CIDR format (e.g., 10.0.0.0/24).",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "network": {"type": "string", "description": "Network in CIDR format"},
+                "comment": {"type": "string", "description": "Network comment/description"}
+            },
+            "required": ["network"]
+        }
+    },
+    {
+        "name": "infoblox_search_records",
+        "description": "Search DNS records by type and filters. Supports A, AAAA, PTR, CNAME, MX, TXT, SRV records.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "record_type": {"type": "string", "description": "Record type (a, aaaa, ptr, cname, mx, txt, srv)"},
+                "name": {"type": "string", "description": "DNS name to search for"},
+                "value": {"type": "string", "description": "IP address or value to search for"},
+                "max_results": {"type": "integer", "default": 100}
+            },
+            "required": ["record_type"]
+        }
+    },
+    {
+        "name": "infoblox_list_dhcp_leases",
+        "description": "List DHCP leases from InfoBlox. Can filter by network or MAC address.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "network": {"type": "string", "description": "Filter by network (e.g., 10.0.0.0/24)"},
+                "mac": {"type": "string", "description": "Filter by MAC address"},
+                "max_results": {"type": "integer", "default": 100}
             }
         }
-    ]
+    },
+    {
+        "name": "infoblox_query",
+        "description": "Generic InfoBlox WAPI query for any object type. Use for advanced queries of any InfoBlox object (zone_auth, fixedaddress, range, etc.).",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "object_type": {"type": "string", "description": "InfoBlox object type (e.g., zone_auth, fixedaddress, range)"},
+                "filters": {"type": "object", "description": "Filter criteria as key-value pairs"},
+                "max_results": {"type": "integer", "default": 100}
+            },
+            "required": ["object_type"]
+        }
+    },
+    {
+        "name": "infoblox_find_network_detailed",
+        "description": "Find network with comprehensive details for operations teams. Returns network info, container, extensible attributes, IP statistics (total/used/free), gateway, DHCP config. Use this for 'find network' or 'show network details' queries.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "network": {"type": "string", "description": "Network in CIDR notation (e.g., 192.168.1.0/24)"}
+            },
+            "required": ["network"]
+        }
+    },
+    {
+        "name": "infoblox_find_ip_detailed",
+        "description": "Find IP address with comprehensive details for operations teams. Returns allocation status (fixed/DHCP/available), MAC address, hostname, network info, DNS records (A/PTR with last queried time), DHCP status. Use for 'find IP' or 'show IP details' queries.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ip_address": {"type": "string", "description": "IP address (e.g., 192.168.1.50)"}
+            },
+            "required": ["ip_address"]
+        }
+    },
+    {
+        "name": "infoblox_find_zone_detailed",
+        "description": "Find DNS zone with comprehensive details for operations teams. Returns zone type, NS group with name servers, subzones list, SOA configuration, record statistics by type, extensible attributes. Use for 'find zone' or 'show zone details' queries.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "zone_name": {"type": "string", "description": "Zone FQDN (e.g., corp.local or example.com)"}
+            },
+            "required": ["zone_name"]
+        }
+    }
+]
 
 
 def main():
@@ -555,12 +768,14 @@ def main():
         print(f"{Colors.BRIGHT_RED}ANTHROPIC_API_KEY not set{Colors.RESET}")
         sys.exit(1)
 
-    client = anthropic.Anthropic(api_key=api_key)
-    tools = get_all_tools()
     conversation_history = []
 
     print_header()
 
+    # Imported after the header so the banner appears without waiting on it
+    import anthropic
+    client = anthropic.Anthropic(api_key=api_key)
+
     # Test InfoBlox connectivity
     print(f"{Colors.BRIGHT_CYAN}Testing InfoBlox connection...{Colors.RESET}")
     test_result = infoblox_client.wapi_request("GET", "network?_max_results=1")
@@ -573,7 +788,7 @@ def main():
 
     while True:
         try:
-            user_input = input(print_user_prompt()).strip()
+            user_input = input(USER_PROMPT).strip()
         except (EOFError, KeyboardInterrupt):
             print()
             print(f"{Colors.BRIGHT_CYAN}Goodbye! 👋{Colors.RESET}")
@@ -592,59 +807,59 @@ def main():
         if not user_input:
             continue
 
+        start = len(conversation_history)
         conversation_history.append({"role": "user", "content": user_input})
 
         print()
-        print_thinking()
 
         while True:
             try:
-                response = client.messages.create(
+                # Stream the reply so text appears as it arrives; complete
+                # lines are wrapped and printed as soon as they end
+                has_text = False
+                pending = ""
+                # Trimming drops older messages, shifting this exchange down
+                start -= trim_history(conversation_history)
+                with client.messages.stream(
                     model="claude-sonnet-4-5-20250929",
                     max_tokens=4096,
-                    tools=tools,
+                    tools=TOOLS,
                     messages=conversation_history
-                )
-
-                clear_line()
-                assistant_message = {"role": "assistant", "content": []}
-                has_text = False
-
-                for block in response.content:
-                    if block.type == "text":
+                ) as stream:
+                    for text in stream.text_stream:
                         if not has_text:
                             print_assistant_prompt()
                             has_text = True
-                        print_message(block.text)
-                        assistant_message["content"].append(block)
-
-                    elif block.type == "tool_use":
-                        assistant_message["content"].append(block)
-                        result = process_tool_call(block.name, block.input)
-
-                        conversation_history.append(assistant_message)
-                        conversation_history.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": json.dumps(result)
-                            }]
-                        })
+                        pending += text
+                        if '\n' in pending:
+                            done, pending = pending.rsplit('\n', 1)
+                            for line in done.split('\n'):
+                                print_message(line)
+                    response = stream.get_final_message()
 
-                        print()
-                        print_thinking()
-                        break
-                else:
+                if pending:
+                    print_message(pending)
+
+                assistant_message = {"role": "assistant", "content": list(response.content)}
+                tool_uses = [block for block in response.content if block.type == "tool_use"]
+                conversation_history.append(assistant_message)
+
+                if not tool_uses:
                     if has_text:
                         print()
-                    conversation_history.append(assistant_message)
                     break
 
+                # Answer every tool_use block in a single user message
+                conversation_history.append({
+                    "role": "user",
+                    "content": run_tool_calls(tool_uses)
+                })
+                print()
+
             except Exception as e:
-                clear_line()
                 print(f"{Colors.BRIGHT_RED}Error: {e}{Colors.RESET}")
-                conversation_history.pop()
+                # Roll back the whole exchange so no tool_use is left unanswered
+                del conversation_history[start:]
                 break
 
 
@@ -32,24 +32,56 @@ security_logger = get_security_logger()
 settings.display_security_warning()
 
 import os
+import stat
 import sys
 import anthropic
 import textwrap
 import json
+import re
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
+from functools import wraps
 import subprocess
-import glob
+import shlex
+import fnmatch
+import itertools
+from itertools import islice
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
 from typing import List, Dict, Any, Optional
 
 try:
     from duckduckgo_search import DDGS
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     from bs4 import BeautifulSoup
     WEB_SEARCH_AVAILABLE = True
 except ImportError:
     WEB_SEARCH_AVAILABLE = False
 
+# Prefer the C-based lxml parser for fetched pages when it is installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Shared session for web fetches so repeat hosts reuse pooled connections
+if WEB_SEARCH_AVAILABLE:
+    _HTTP = requests.Session()
+    _HTTP.headers.update({'User-Agent': 'Mozilla/5.0'})
+    _http_adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=2, backoff_factor=0.3, raise_on_status=False)
+    )
+    _HTTP.mount('http://', _http_adapter)
+    _HTTP.mount('https://', _http_adapter)
+
 # Try to import MCP client
 try:
     from mcp import ClientSession, StdioServerParameters
@@ -59,6 +91,57 @@ except ImportError:
     MCP_AVAILABLE = False
     print("Warning: MCP not available. Install with: pip install mcp")
 
+# uvloop speeds up the stdio pipe traffic to MCP servers. It cannot spawn
+# server subprocesses on macOS with Python 3.12+, so use stock asyncio there.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+if sys.platform == 'darwin' and sys.version_info >= (3, 12):
+    uvloop = None
+
+# orjson serializes large tool results much faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds to wait for an MCP tool call before giving up
+MCP_CALL_TIMEOUT = 30
+
+# Number of most recent user/assistant exchanges sent to Claude each turn
+MAX_HISTORY_TURNS = 20
+
+# Built-in tools block on I/O, so they run on a dedicated thread pool
+MAX_TOOL_WORKERS = 8
+_EXEC = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix='tool')
+
+# Web lookup caches: entries per tool, and seconds before a result is refetched
+WEB_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = 300
+FETCH_CACHE_TTL = 3600
+
+# Bytes of a fetched page read and parsed; content is truncated well before this
+MAX_FETCH_BYTES = 256 * 1024
+
+# Characters that need a shell: operators, expansions, globs, comments
+_SHELL_SYNTAX_RE = re.compile(r'[|&;<>()$`\\*?\[\]{}~!#\n]|^\s*\w+=')
+
+# Characters of command output returned to Claude
+MAX_COMMAND_OUTPUT = 32 * 1024
+
+# Characters of a file returned by read_file
+MAX_READ_CHARS = 10000
+
+# search_files returns at most this many paths
+MAX_FILE_RESULTS = 50
+
+# Directories search_files never descends into
+_SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__'})
+
+# Page text is split into phrases at line breaks and double spaces
+_TEXT_BREAK_RE = re.compile(r'\s*(?:[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]| {2})\s*')
+
 # ANSI color codes
 class Colors:
     RESET = '\033[0m'
@@ -88,12 +171,54 @@ class Colors:
     BG_CYAN = '\033[46m'
 
 
+def _render_header(width=80):
+    """Build the startup banner as one string"""
+    lines = [
+        "",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}",
+        f"{Colors.BOLD}{Colors.BRIGHT_WHITE}{'🤖 Claude Sonnet 4.5 - DDI Assistant with MCP':^{width}}{Colors.RESET}",
+        f"{Colors.BRIGHT_BLUE}{'Enhanced AI Chat with Web Search, System Access & InfoBlox':^{width}}{Colors.RESET}",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}",
+        "",
+        f"{Colors.BRIGHT_GREEN}  Capabilities:{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    🌐{Colors.RESET} Web search and browsing",
+        f"{Colors.BRIGHT_YELLOW}    📁{Colors.RESET} File system access (read, search)",
+        f"{Colors.BRIGHT_YELLOW}    💻{Colors.RESET} System commands and information",
+        f"{Colors.BRIGHT_YELLOW}    📅{Colors.RESET} Current date and time",
+    ]
+    if MCP_AVAILABLE:
+        lines.append(f"{Colors.BRIGHT_YELLOW}    🔌{Colors.RESET} MCP servers (InfoBlox and more)")
+    lines += [
+        "",
+        f"{Colors.BRIGHT_GREEN}  Commands:{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type your message and press {Colors.BOLD}Enter{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'exit'{Colors.RESET}, {Colors.BOLD}{Colors.CYAN}'quit'{Colors.RESET}, or {Colors.BOLD}{Colors.CYAN}'bye'{Colors.RESET} to end",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'clear'{Colors.RESET} to start a new conversation",
+        "",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'─' * width}{Colors.RESET}",
+        "",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# Startup banner and chat prompts, rendered once
+HEADER = _render_header()
+USER_PROMPT = f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+ASSISTANT_PROMPT = f"\n{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} "
+
+
 class MCPServerManager:
     """Manages MCP server connections"""
 
     def __init__(self):
         self.servers = {}
         self.server_tools = {}
+        self._tasks = []
+        self._shutdown = asyncio.Event()
+        # Server name -> its tools converted to Anthropic tool format
+        self._anthropic_tools: Dict[str, List[Dict]] = {}
+        # Tool name -> name of the server providing it
+        self._tool_index: Dict[str, str] = {}
 
     async def connect_server(self, name: str, command: str, args: List[str] = None):
         """Connect to an MCP server"""
@@ -101,47 +226,73 @@ class MCPServerManager:
             print(f"{Colors.BRIGHT_RED}MCP not available{Colors.RESET}")
             return False
 
+        server_params = StdioServerParameters(
+            command=command,
+            args=args or []
+        )
+
+        # The server is owned by a long-lived task so its subprocess and
+        # session stay open across tool calls until disconnect_all()
+        ready = asyncio.get_running_loop().create_future()
+        self._tasks.append(asyncio.ensure_future(self._serve(name, server_params, ready)))
+
         try:
-            server_params = StdioServerParameters(
-                command=command,
-                args=args or []
-            )
+            tool_count = await ready
+        except Exception as e:
+            print(f"{Colors.BRIGHT_RED}✗ Error connecting to {name}: {e}{Colors.RESET}")
+            return False
 
-            stdio_transport = await stdio_client(server_params)
-            stdio, write = stdio_transport
+        print(f"{Colors.BRIGHT_GREEN}✓ Connected to {name} MCP server{Colors.RESET}")
+        print(f"  {tool_count} tools available")
+        return True
 
-            async with ClientSession(stdio, write) as session:
+    async def _serve(self, name: str, server_params, ready):
+        """Open a server's transport and session, then hold them until shutdown"""
+        try:
+            # Entered and exited in this one task, as the stdio transport requires
+            async with AsyncExitStack() as stack:
+                stdio, write = await stack.enter_async_context(stdio_client(server_params))
+                session = await stack.enter_async_context(ClientSession(stdio, write))
                 await session.initialize()
 
                 # List available tools
                 tools_result = await session.list_tools()
                 self.server_tools[name] = tools_result.tools
-                self.servers[name] = {
-                    'session': session,
-                    'transport': stdio_transport
-                }
-
-                print(f"{Colors.BRIGHT_GREEN}✓ Connected to {name} MCP server{Colors.RESET}")
-                print(f"  {len(tools_result.tools)} tools available")
-                return True
-
+                self._tool_index.update((tool.name, name) for tool in tools_result.tools)
+                self._anthropic_tools[name] = [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "input_schema": tool.inputSchema
+                    }
+                    for tool in tools_result.tools
+                ]
+                self.servers[name] = {'session': session}
+                ready.set_result(len(tools_result.tools))
+
+                await self._shutdown.wait()
         except Exception as e:
-            print(f"{Colors.BRIGHT_RED}✗ Error connecting to {name}: {e}{Colors.RESET}")
-            return False
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.error(f"MCP server {name} stopped: {e}", exc_info=True)
+        finally:
+            self.servers.pop(name, None)
+
+    async def disconnect_all(self):
+        """Close every server session and stop its subprocess"""
+        self._shutdown.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
 
     def get_all_tools(self) -> List[Dict]:
         """Get all tools from all connected MCP servers"""
-        all_tools = []
-        for server_name, tools in self.server_tools.items():
-            for tool in tools:
-                # Convert MCP tool to Anthropic tool format
-                all_tools.append({
-                    "name": tool.name,
-                    "description": tool.description,
-                    "input_schema": tool.inputSchema,
-                    "_mcp_server": server_name
-                })
-        return all_tools
+        # Converted once at connect time; calls are routed via server_for_tool
+        return list(itertools.chain.from_iterable(self._anthropic_tools.values()))
+
+    def server_for_tool(self, tool_name: str) -> Optional[str]:
+        """Name of the connected server providing tool_name, if any"""
+        return self._tool_index.get(tool_name)
 
     async def call_tool(self, server_name: str, tool_name: str, arguments: Dict) -> Any:
         """Call a tool on an MCP server"""
@@ -158,39 +309,14 @@ class MCPServerManager:
 
 def print_header():
     """Print styled header"""
-    width = 80
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BRIGHT_WHITE}{'🤖 Claude Sonnet 4.5 - DDI Assistant with MCP':^{width}}{Colors.RESET}")
-    print(f"{Colors.BRIGHT_BLUE}{'Enhanced AI Chat with Web Search, System Access & InfoBlox':^{width}}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}")
-    print()
-    print(f"{Colors.BRIGHT_GREEN}  Capabilities:{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    🌐{Colors.RESET} Web search and browsing")
-    print(f"{Colors.BRIGHT_YELLOW}    📁{Colors.RESET} File system access (read, search)")
-    print(f"{Colors.BRIGHT_YELLOW}    💻{Colors.RESET} System commands and information")
-    print(f"{Colors.BRIGHT_YELLOW}    📅{Colors.RESET} Current date and time")
-    if MCP_AVAILABLE:
-        print(f"{Colors.BRIGHT_YELLOW}    🔌{Colors.RESET} MCP servers (InfoBlox and more)")
-    print()
-    print(f"{Colors.BRIGHT_GREEN}  Commands:{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type your message and press {Colors.BOLD}Enter{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'exit'{Colors.RESET}, {Colors.BOLD}{Colors.CYAN}'quit'{Colors.RESET}, or {Colors.BOLD}{Colors.CYAN}'bye'{Colors.RESET} to end")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'clear'{Colors.RESET} to start a new conversation")
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'─' * width}{Colors.RESET}")
-    print()
-
-
-def print_user_prompt():
-    """Print styled user prompt"""
-    return f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+    sys.stdout.write(HEADER)
+    sys.stdout.flush()
 
 
 def print_assistant_prompt():
     """Print styled assistant prompt"""
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} ", end='', flush=True)
+    sys.stdout.write(ASSISTANT_PROMPT)
+    sys.stdout.flush()
 
 
 def print_message(text, is_user=False):
@@ -204,14 +330,93 @@ def print_message(text, is_user=False):
         print(f"{color}{line}{Colors.RESET}")
 
 
-def print_thinking():
-    """Print thinking indicator"""
-    print(f"{Colors.DIM}{Colors.BRIGHT_BLACK}  (thinking...){Colors.RESET}", end='', flush=True)
+class Spinner:
+    """Animated thinking indicator drawn by a background thread"""
 
+    FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+    INTERVAL = 0.1
 
-def clear_line():
-    """Clear the current line"""
-    print('\r\033[K', end='', flush=True)
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """Start spinning; does nothing if already running"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._spin, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop spinning and erase the indicator; does nothing if not running"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            sys.stdout.write('\r\033[K')
+            sys.stdout.flush()
+
+    def _spin(self):
+        for frame in itertools.cycle(self.FRAMES):
+            sys.stdout.write(f"\r{Colors.DIM}{Colors.BRIGHT_BLACK}  {frame} thinking...{Colors.RESET}")
+            sys.stdout.flush()
+            if self._stop.wait(self.INTERVAL):
+                break
+
+
+# Shown while waiting on Claude or tools; stopped before any other output
+SPINNER = Spinner()
+
+
+def _json_default(obj):
+    """Serialize values json cannot, such as MCP CallToolResult models"""
+    model_dump = getattr(obj, "model_dump", None)
+    if model_dump is not None:
+        return model_dump(mode="json")
+    return str(obj)
+
+
+def dump_tool_result(result):
+    """Serialize a tool result for the tool_result message"""
+    if orjson is not None:
+        return orjson.dumps(result, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result, default=_json_default)
+
+
+def ttl_lru_cache(ttl):
+    """
+    Memoize a web lookup for ttl seconds, keeping the WEB_CACHE_SIZE most
+    recently used results. Errors are not cached.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(args)
+                if hit is not None and now - hit[0] < ttl:
+                    cache.move_to_end(args)
+                    return hit[1]
+
+            result = func(*args)
+            if "error" not in result:
+                with lock:
+                    cache[args] = (now, result)
+                    cache.move_to_end(args)
+                    if len(cache) > WEB_CACHE_SIZE:
+                        cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
 
 
 # Built-in tool functions (web search, file system, etc.)
@@ -237,19 +442,31 @@ def execute_simple_command(command):
             return f"Error: Invalid command - {e}"
 
         logger.info(f"Executing command: {command}")
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        return result.stdout + result.stderr
+        # Plain commands are exec'd directly; only shell syntax needs /bin/sh.
+        # stderr is merged into stdout so there is a single pipe to drain.
+        args = None if _SHELL_SYNTAX_RE.search(command) else shlex.split(command)
+        try:
+            result = subprocess.run(
+                args or command, shell=args is None, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, timeout=10, check=False
+            )
+        except FileNotFoundError:
+            # Not an executable (e.g. a shell builtin); let the shell handle it
+            result = subprocess.run(
+                command, shell=True, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, timeout=10, check=False
+            )
+
+        output = result.stdout.decode(errors='replace')
+        if len(output) > MAX_COMMAND_OUTPUT:
+            output = output[:MAX_COMMAND_OUTPUT] + "...[truncated]"
+        return output
     except Exception as e:
         logger.error(f"Command execution error: {e}", exc_info=True)
         return f"Error: {e}"
 
 
+@ttl_lru_cache(SEARCH_CACHE_TTL)
 def web_search(query, max_results=5):
     """Search the web using DuckDuckGo"""
     if not WEB_SEARCH_AVAILABLE:
@@ -263,25 +480,25 @@ def web_search(query, max_results=5):
         return {"error": str(e)}
 
 
+@ttl_lru_cache(FETCH_CACHE_TTL)
 def fetch_webpage(url):
     """Fetch and extract text from a webpage"""
     if not WEB_SEARCH_AVAILABLE:
         return {"error": "Web fetching not available"}
 
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        # Read at most MAX_FETCH_BYTES; the rest of the page is never downloaded
+        with _HTTP.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            raw = response.raw.read(MAX_FETCH_BYTES, decode_content=True)
+            encoding = response.encoding or 'utf-8'
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(raw.decode(encoding, errors='replace'), HTML_PARSER)
 
         for script in soup(["script", "style"]):
             script.decompose()
 
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
+        text = '\n'.join(filter(None, _TEXT_BREAK_RE.split(soup.get_text().strip())))
 
         if len(text) > 5000:
             text = text[:5000] + "...[truncated]"
@@ -291,11 +508,37 @@ def fetch_webpage(url):
         return {"error": str(e), "url": url}
 
 
+def _iter_matches(directory, pattern):
+    """Lazily yield paths under directory whose name matches pattern, shallowest first"""
+    matcher = re.compile(fnmatch.translate(pattern)).match
+    # Like glob, hidden entries only match a pattern that starts with '.' and
+    # hidden directories are never searched
+    include_hidden = pattern.startswith('.')
+    pending = deque([directory])
+    while pending:
+        try:
+            entries = os.scandir(pending.popleft())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                hidden = name[0] == '.'
+                if matcher(name) and (include_hidden or not hidden):
+                    yield entry.path
+                try:
+                    if not hidden and name not in _SKIP_DIRS and entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                except OSError:
+                    pass
+
+
 def search_files(pattern, directory="."):
     """Search for files matching a pattern"""
     try:
-        files = glob.glob(os.path.join(directory, "**", pattern), recursive=True)
-        return {"files": files[:50], "pattern": pattern, "directory": directory}
+        # Stop walking as soon as enough matches are found
+        files = list(islice(_iter_matches(directory, pattern), MAX_FILE_RESULTS))
+        return {"files": files, "pattern": pattern, "directory": directory}
     except Exception as e:
         return {"error": str(e)}
 
@@ -303,144 +546,213 @@ def search_files(pattern, directory="."):
 def read_file_content(file_path):
     """Read content from a file"""
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        if len(content) > 10000:
-            content = content[:10000] + "...[truncated]"
+        # Devices and FIFOs (/dev/zero, named pipes) may never end or block
+        if not stat.S_ISREG(os.stat(file_path).st_mode):
+            return {"error": "Not a regular file", "file_path": file_path}
+
+        # UTF-8 needs at most 4 bytes per character, so this always covers
+        # one character past the limit without reading the whole file
+        with open(file_path, 'rb') as f:
+            raw = f.read(4 * (MAX_READ_CHARS + 1))
+        content = raw.decode('utf-8', errors='replace')
+        if len(content) > MAX_READ_CHARS:
+            content = content[:MAX_READ_CHARS] + "...[truncated]"
         return {"file_path": file_path, "content": content}
     except Exception as e:
         return {"error": str(e), "file_path": file_path}
 
 
-def process_tool_call(tool_name, tool_input, mcp_manager=None):
-    """Process tool calls - both built-in and MCP tools with confirmation for InfoBlox"""
+def confirm_tool_call(tool_name, tool_input, mcp_manager=None):
+    """
+    Log a tool call and get user confirmation for MCP (InfoBlox) tools.
+
+    Returns (tool_input, cancelled_result); cancelled_result is None when the
+    call should run with the returned input.
+    """
     logger.info(f"Tool called: {tool_name}")
     security_logger.info(f"TOOL_EXECUTION - Tool: {tool_name}, Input: {json.dumps(tool_input, default=str)}")
 
-    # Check if it's an InfoBlox MCP tool - require confirmation
-    if mcp_manager and tool_name.startswith('infoblox_'):
+    # MCP tools (InfoBlox) act on external systems - require confirmation
+    if tool_name not in _BUILTIN_HANDLERS and mcp_manager and mcp_manager.server_for_tool(tool_name):
         # Show API preview and get user confirmation
+        SPINNER.stop()
         should_execute, final_input, username = api_confirmation.confirm_api_call(tool_name, tool_input)
 
         if not should_execute:
-            return {"cancelled": True, "message": "API call cancelled by user"}
-
-        # Use modified input from confirmation
-        tool_input = final_input
+            return tool_input, {"cancelled": True, "message": "API call cancelled by user"}
 
         # Note: Username change for MCP tools would require updating MCP server env
         # For now, log warning if username was changed
         if username and username != settings.infoblox_user:
             logger.warning(f"Username change requested but not supported for MCP tools: {username}")
 
-        # Find which server has this tool
-        for server_name, tools in mcp_manager.server_tools.items():
-            if any(t.name == tool_name for t in tools):
-                # Call MCP tool asynchronously
-                loop = asyncio.get_event_loop()
-                result = loop.run_until_complete(
-                    mcp_manager.call_tool(server_name, tool_name, tool_input)
-                )
-                return result
-        return {"error": "MCP tool not found"}
-
-    # Built-in tools - execute immediately (no confirmation needed)
-    if tool_name == "get_current_datetime":
-        return get_current_datetime()
-    elif tool_name == "execute_command":
-        command = tool_input.get("command")
-        output = execute_simple_command(command)
-        return {"output": output}
-    elif tool_name == "web_search":
-        query = tool_input.get("query")
-        max_results = tool_input.get("max_results", 5)
-        return web_search(query, max_results)
-    elif tool_name == "fetch_webpage":
-        url = tool_input.get("url")
-        return fetch_webpage(url)
-    elif tool_name == "search_files":
-        pattern = tool_input.get("pattern")
-        directory = tool_input.get("directory", ".")
-        return search_files(pattern, directory)
-    elif tool_name == "read_file":
-        file_path = tool_input.get("file_path")
-        return read_file_content(file_path)
-
-    return {"error": "Unknown tool"}
+        # Use modified input from confirmation
+        return final_input, None
 
+    return tool_input, None
+
+
+# Built-in tool name -> handler taking the tool input dict (no confirmation needed)
+_BUILTIN_HANDLERS = {
+    "get_current_datetime": lambda t: get_current_datetime(),
+    "execute_command": lambda t: {"output": execute_simple_command(t.get("command"))},
+    "web_search": lambda t: web_search(t.get("query"), t.get("max_results", 5)),
+    "fetch_webpage": lambda t: fetch_webpage(t.get("url")),
+    "search_files": lambda t: search_files(t.get("pattern"), t.get("directory", ".")),
+    "read_file": lambda t: read_file_content(t.get("file_path")),
+}
+
+
+async def _run_tool(tool_name, tool_input, mcp_manager=None):
+    """Run one confirmed tool call on the MCP event loop"""
+    handler = _BUILTIN_HANDLERS.get(tool_name)
+    if handler is not None:
+        # Built-in tools block, so run them off the loop
+        return await asyncio.get_running_loop().run_in_executor(_EXEC, handler, tool_input)
+
+    server_name = mcp_manager.server_for_tool(tool_name) if mcp_manager else None
+    if server_name is None:
+        return {"error": "Unknown tool"}
+
+    try:
+        return await asyncio.wait_for(
+            mcp_manager.call_tool(server_name, tool_name, tool_input), MCP_CALL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        return {"error": f"MCP tool timed out after {MCP_CALL_TIMEOUT} seconds"}
+
+
+async def _resolved(result):
+    return result
+
+
+def run_tool_calls(tool_uses, mcp_manager, loop):
+    """
+    Run every tool_use block from one response concurrently, returning
+    tool_result blocks in the same order.
+
+    Confirmation prompts happen first, one at a time, on the calling thread.
+    """
+    calls = []
+    for block in tool_uses:
+        tool_input, cancelled = confirm_tool_call(block.name, block.input, mcp_manager)
+        if cancelled is not None:
+            calls.append(_resolved(cancelled))
+        else:
+            calls.append(_run_tool(block.name, tool_input, mcp_manager))
+
+    async def gather():
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run_coroutine_threadsafe(gather(), loop).result()
 
-def get_builtin_tools():
-    """Get built-in tool definitions"""
     return [
         {
-            "name": "get_current_datetime",
-            "description": "Get the current date and time",
-            "input_schema": {
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        },
-        {
-            "name": "web_search",
-            "description": "Search the web using DuckDuckGo",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "The search query"},
-                    "max_results": {"type": "integer", "description": "Max results", "default": 5}
-                },
-                "required": ["query"]
-            }
-        },
-        {
-            "name": "fetch_webpage",
-            "description": "Fetch and read webpage content",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "URL to fetch"}
-                },
-                "required": ["url"]
-            }
-        },
-        {
-            "name": "search_files",
-            "description": "Search for files by pattern",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "pattern": {"type": "string", "description": "File pattern (*.py)"},
-                    "directory": {"type": "string", "description": "Directory to search", "default": "."}
-                },
-                "required": ["pattern"]
-            }
-        },
-        {
-            "name": "read_file",
-            "description": "Read file contents",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string", "description": "Path to file"}
-                },
-                "required": ["file_path"]
-            }
-        },
-        {
-            "name": "execute_command",
-            "description": "Execute shell command",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "command": {"type": "string", "description": "Command to execute"}
-                },
-                "required": ["command"]
-            }
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": dump_tool_result(result)
         }
+        for block, result in zip(tool_uses, results)
     ]
 
 
+def trim_history(conversation_history):
+    """
+    Drop the oldest messages so at most MAX_HISTORY_TURNS exchanges are sent.
+
+    Trimming happens in place and always resumes at a plain user prompt, so
+    the history never starts with an orphaned tool_result. Returns how many
+    messages were dropped.
+    """
+    excess = len(conversation_history) - 2 * MAX_HISTORY_TURNS
+    if excess <= 0:
+        return 0
+
+    for cut in range(excess, len(conversation_history)):
+        message = conversation_history[cut]
+        if message["role"] == "user" and isinstance(message["content"], str):
+            del conversation_history[:cut]
+            return cut
+    return 0
+
+
+# Built-in tool definitions; built once at import
+_BUILTIN_TOOLS = [
+    {
+        "name": "get_current_datetime",
+        "description": "Get the current date and time",
+        "input_schema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "web_search",
+        "description": "Search the web using DuckDuckGo",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "The search query"},
+                "max_results": {"type": "integer", "description": "Max results", "default": 5}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "fetch_webpage",
+        "description": "Fetch and read webpage content",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "URL to fetch"}
+            },
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "search_files",
+        "description": "Search for files by pattern",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string", "description": "File pattern (*.py)"},
+                "directory": {"type": "string", "description": "Directory to search", "default": "."}
+            },
+            "required": ["pattern"]
+        }
+    },
+    {
+        "name": "read_file",
+        "description": "Read file contents",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "Path to file"}
+            },
+            "required": ["file_path"]
+        }
+    },
+    {
+        "name": "execute_command",
+        "description": "Execute shell command",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "Command to execute"}
+            },
+            "required": ["command"]
+        }
+    }
+]
+
+
+def get_builtin_tools():
+    """Get built-in tool definitions"""
+    # Copy so callers can append MCP tools without touching the constant
+    return list(_BUILTIN_TOOLS)
+
+
 async def initialize_mcp_servers():
     """Initialize MCP server connections"""
     logger.info("Initializing MCP server connections")
@@ -452,14 +764,20 @@ async def initialize_mcp_servers():
 
     print(f"{Colors.BRIGHT_CYAN}Initializing MCP servers...{Colors.RESET}")
 
-    # Connect to InfoBlox MCP server
+    # (name, command, args) for each MCP server that is installed
+    servers = []
     infoblox_server = os.path.expanduser("~/REDHAT/infoblox-mcp-server.py")
     if os.path.exists(infoblox_server):
-        await mcp_manager.connect_server(
-            "infoblox",
-            "python",
-            [infoblox_server]
-        )
+        servers.append(("infoblox", "python", [infoblox_server]))
+
+    # Servers start independently, so connect to all of them at once
+    results = await asyncio.gather(
+        *(mcp_manager.connect_server(name, command, args) for name, command, args in servers),
+        return_exceptions=True
+    )
+    for (name, _, _), result in zip(servers, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to connect MCP server {name}: {result}")
 
     print()
     return mcp_manager
@@ -477,10 +795,10 @@ def main():
 
     client = anthropic.Anthropic(api_key=api_key)
 
-    # Initialize MCP servers
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    mcp_manager = loop.run_until_complete(initialize_mcp_servers())
+    # MCP sessions live on one event loop running in a background thread
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    mcp_manager = asyncio.run_coroutine_threadsafe(initialize_mcp_servers(), loop).result()
 
     # Combine built-in and MCP tools
     tools = get_builtin_tools()
@@ -488,13 +806,16 @@ def main():
         mcp_tools = mcp_manager.get_all_tools()
         tools.extend(mcp_tools)
 
+    # Tools are identical on every request, so mark them as a cacheable prompt prefix
+    tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
+
     conversation_history = []
 
     print_header()
 
     while True:
         try:
-            user_input = input(print_user_prompt()).strip()
+            user_input = input(USER_PROMPT).strip()
         except (EOFError, KeyboardInterrupt):
             print()
             print()
@@ -522,67 +843,76 @@ def main():
         if not user_input:
             continue
 
+        start = len(conversation_history)
         conversation_history.append({
             "role": "user",
             "content": user_input
         })
 
         print()
-        print_thinking()
+        SPINNER.start()
 
         while True:
             try:
-                response = client.messages.create(
+                # Stream the reply so text appears as it arrives; complete
+                # lines are wrapped and printed as soon as they end
+                has_text = False
+                pending = ""
+                # Trimming drops older messages, shifting this exchange down
+                start -= trim_history(conversation_history)
+                with client.messages.stream(
                     model="claude-sonnet-4-5-20250929",
                     max_tokens=4096,
                     tools=tools,
                     messages=conversation_history
-                )
-
-                clear_line()
-
-                assistant_message = {"role": "assistant", "content": []}
-                has_text = False
-
-                for block in response.content:
-                    if block.type == "text":
+                ) as stream:
+                    for text in stream.text_stream:
                         if not has_text:
+                            SPINNER.stop()
                             print_assistant_prompt()
                             has_text = True
-                        print_message(block.text, is_user=False)
-                        assistant_message["content"].append(block)
-
-                    elif block.type == "tool_use":
-                        assistant_message["content"].append(block)
-
-                        # Process tool call
-                        result = process_tool_call(block.name, block.input, mcp_manager)
-
-                        conversation_history.append(assistant_message)
-                        conversation_history.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": json.dumps(result)
-                            }]
-                        })
-
-                        print()
-                        print_thinking()
-                        break
-                else:
+                        pending += text
+                        if '\n' in pending:
+                            done, pending = pending.rsplit('\n', 1)
+                            for line in done.split('\n'):
+                                print_message(line)
+                    response = stream.get_final_message()
+
+                if pending:
+                    print_message(pending)
+
+                assistant_message = {"role": "assistant", "content": list(response.content)}
+                tool_uses = [block for block in response.content if block.type == "tool_use"]
+                conversation_history.append(assistant_message)
+
+                if not tool_uses:
+                    SPINNER.stop()
                     if has_text:
                         print()
-                    conversation_history.append(assistant_message)
                     break
 
+                # Answer every tool_use block in a single user message
+                conversation_history.append({
+                    "role": "user",
+                    "content": run_tool_calls(tool_uses, mcp_manager, loop)
+                })
+
+                # Keep spinning unless text or a confirmation prompt stopped it
+                if not SPINNER.running:
+                    print()
+                    SPINNER.start()
+
             except Exception as e:
-                clear_line()
+                SPINNER.stop()
                 print(f"{Colors.BRIGHT_RED}Error: {e}{Colors.RESET}")
-                conversation_history.pop()
+                # Roll back the whole exchange so no tool_use is left unanswered
+                del conversation_history[start:]
                 break
 
+    # Shut down MCP server subprocesses, then the loop thread
+    asyncio.run_coroutine_threadsafe(mcp_manager.disconnect_all(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
 
 if __name__ == '__main__':
     main()
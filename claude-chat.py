@@ -3,19 +3,98 @@
 
 import os
 import sys
-import anthropic
 import textwrap
 import json
+import re
 from datetime import datetime
+from html import unescape
 import subprocess
-import glob
+import shlex
+import fnmatch
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson serializes large tool results much faster than the json module
 try:
-    from duckduckgo_search import DDGS
-    import requests
-    from bs4 import BeautifulSoup
-    WEB_SEARCH_AVAILABLE = True
+    import orjson
 except ImportError:
-    WEB_SEARCH_AVAILABLE = False
+    orjson = None
+
+# Web search/parsing libraries are slow to import, so they are loaded by
+# _load_web_libraries on first use; None means they have not been probed yet
+WEB_SEARCH_AVAILABLE = None
+DDGS = None
+BeautifulSoup = None
+WEB_SESSION = None
+WEB_SEARCH_CLIENT = None
+HTML_PARSER = 'html.parser'
+trafilatura = None
+
+# Page text is split into phrases at line breaks and double spaces
+_TEXT_BREAK_RE = re.compile(r'\s*(?:[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]| {2})\s*')
+
+# Page title, read directly when BeautifulSoup is not needed
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+# Characters of page text returned by fetch_webpage
+MAX_PAGE_CHARS = 5000
+
+# Characters that need a shell: operators, expansions, globs, comments
+_SHELL_SYNTAX_RE = re.compile(r'[|&;<>()$`\\*?\[\]{}~!#\n]|^\s*\w+=')
+
+# Characters of a file returned by read_file
+MAX_READ_CHARS = 10000
+
+# search_files returns at most this many paths
+MAX_FILE_RESULTS = 50
+
+# Directories search_files never descends into
+_SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__'})
+
+# Concurrent requests made by fetch_webpages
+MAX_FETCH_WORKERS = 8
+
+# Concurrent tool calls run for one response
+MAX_TOOL_WORKERS = 8
+
+# System prompt sent with every request; marked cacheable along with the tools
+SYSTEM_PROMPT = [
+    {
+        "type": "text",
+        "text": (
+            "You are DDI Assistant, a helpful command-line assistant. You can search "
+            "the web, fetch webpages, search and read local files, run simple shell "
+            "commands, and check the current date and time using the provided tools."
+        ),
+        "cache_control": {"type": "ephemeral"}
+    }
+]
+
+# Number of answers kept for repeated questions within a session
+RESPONSE_CACHE_SIZE = 64
+
+# Models: the default answers normal questions, the fast one handles
+# trivial prompts, history summaries and routing itself
+DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
+FAST_MODEL = "claude-haiku-4-5"
+
+# Router verdict -> model used for the whole exchange
+ROUTE_MODELS = {
+    "SIMPLE": FAST_MODEL,
+    "NORMAL": DEFAULT_MODEL,
+    "HARD": DEFAULT_MODEL,
+}
+
+# Number of routing decisions remembered for repeated prompts
+ROUTE_CACHE_SIZE = 256
+
+# Recent exchanges kept verbatim; once twice as many have built up, the
+# older ones are replaced by a summary written by the fast model
+HISTORY_KEEP_TURNS = 8
+
+# Tool results larger than this are elided once their exchange is not the latest
+MAX_TOOL_RESULT_CHARS = 2048
 
 # ANSI color codes
 class Colors:
@@ -48,77 +127,163 @@ class Colors:
     BG_BLUE = '\033[44m'
     BG_CYAN = '\033[46m'
 
+def _render_header(width=80):
+    """Build the startup banner as one string"""
+    lines = [
+        "",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}",
+        f"{Colors.BOLD}{Colors.BRIGHT_WHITE}{'🤖 Claude Sonnet 4.5 - DDI Assistant':^{width}}{Colors.RESET}",
+        f"{Colors.BRIGHT_BLUE}{'Enhanced AI Chat with Web Search & System Access':^{width}}{Colors.RESET}",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}",
+        "",
+        f"{Colors.BRIGHT_GREEN}  Capabilities:{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    🌐{Colors.RESET} Web search and browsing",
+        f"{Colors.BRIGHT_YELLOW}    📁{Colors.RESET} File system access (read, search)",
+        f"{Colors.BRIGHT_YELLOW}    💻{Colors.RESET} System commands and information",
+        f"{Colors.BRIGHT_YELLOW}    📅{Colors.RESET} Current date and time",
+        "",
+        f"{Colors.BRIGHT_GREEN}  Commands:{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type your message and press {Colors.BOLD}Enter{Colors.RESET}",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'exit'{Colors.RESET}, {Colors.BOLD}{Colors.CYAN}'quit'{Colors.RESET}, or {Colors.BOLD}{Colors.CYAN}'bye'{Colors.RESET} to end",
+        f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'clear'{Colors.RESET} to start a new conversation",
+        "",
+        f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'─' * width}{Colors.RESET}",
+        "",
+    ]
+    return "\n".join(lines) + "\n"
+
+# Banners, prompts and indicators, rendered once
+HEADER = _render_header()
+GOODBYE = (
+    f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}\n"
+    f"{Colors.BRIGHT_CYAN}  Goodbye! 👋 Thanks for chatting!{Colors.RESET}\n"
+    f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}\n\n"
+)
+USER_PROMPT = f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+ASSISTANT_PROMPT = f"\n{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} "
+THINKING = f"{Colors.DIM}{Colors.BRIGHT_BLACK}  (thinking...){Colors.RESET}"
+DIVIDER = f"{Colors.DIM}{Colors.BRIGHT_BLACK}{'─' * 80}{Colors.RESET}"
+
+# Status type -> colored icon prefix
+_STATUS_PREFIXES = {
+    'success': f"{Colors.BRIGHT_GREEN}{Colors.BOLD}✓ ",
+    'error': f"{Colors.BRIGHT_RED}{Colors.BOLD}✗ ",
+    'info': f"{Colors.BRIGHT_CYAN}{Colors.BOLD}ℹ ",
+}
+_DEFAULT_STATUS_PREFIX = f"{Colors.BRIGHT_YELLOW}{Colors.BOLD}• "
+
+# Shared wrapper so its settings and regexes are set up once
+_WRAPPER = textwrap.TextWrapper(width=75, break_long_words=False, break_on_hyphens=False)
+
 def print_header():
     """Print styled header"""
-    width = 80
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BRIGHT_WHITE}{'🤖 Claude Sonnet 4.5 - DDI Assistant':^{width}}{Colors.RESET}")
-    print(f"{Colors.BRIGHT_BLUE}{'Enhanced AI Chat with Web Search & System Access':^{width}}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * width}{Colors.RESET}")
-    print()
-    print(f"{Colors.BRIGHT_GREEN}  Capabilities:{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    🌐{Colors.RESET} Web search and browsing")
-    print(f"{Colors.BRIGHT_YELLOW}    📁{Colors.RESET} File system access (read, search)")
-    print(f"{Colors.BRIGHT_YELLOW}    💻{Colors.RESET} System commands and information")
-    print(f"{Colors.BRIGHT_YELLOW}    📅{Colors.RESET} Current date and time")
-    print()
-    print(f"{Colors.BRIGHT_GREEN}  Commands:{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type your message and press {Colors.BOLD}Enter{Colors.RESET}")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'exit'{Colors.RESET}, {Colors.BOLD}{Colors.CYAN}'quit'{Colors.RESET}, or {Colors.BOLD}{Colors.CYAN}'bye'{Colors.RESET} to end")
-    print(f"{Colors.BRIGHT_YELLOW}    •{Colors.RESET} Type {Colors.BOLD}{Colors.CYAN}'clear'{Colors.RESET} to start a new conversation")
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'─' * width}{Colors.RESET}")
-    print()
-
-def print_user_prompt():
-    """Print styled user prompt"""
-    return f"{Colors.BOLD}{Colors.BRIGHT_GREEN}You:{Colors.RESET} "
+    sys.stdout.write(HEADER)
+    sys.stdout.flush()
+
+def print_goodbye():
+    """Print styled farewell banner"""
+    sys.stdout.write(GOODBYE)
+    sys.stdout.flush()
 
 def print_assistant_prompt():
     """Print styled assistant prompt"""
-    print()
-    print(f"{Colors.BOLD}{Colors.BRIGHT_MAGENTA}DDI Assistant:{Colors.RESET} ", end='', flush=True)
+    sys.stdout.write(ASSISTANT_PROMPT)
+    sys.stdout.flush()
 
 def print_message(text, is_user=False):
     """Print formatted message with word wrapping"""
-    width = 75
-    if is_user:
-        color = Colors.BRIGHT_WHITE
+    # Bind colors locally; this runs for every streamed line
+    color, reset = Colors.BRIGHT_WHITE, Colors.RESET
+    if len(text) <= _WRAPPER.width:
+        # Already fits; skip TextWrapper's regex splitting
+        lines = [text.rstrip()]
     else:
-        color = Colors.BRIGHT_WHITE
-
-    # Wrap text to terminal width
-    wrapped = textwrap.fill(text, width=width, break_long_words=False, break_on_hyphens=False)
-
-    # Print with color
-    for line in wrapped.split('\n'):
-        print(f"{color}{line}{Colors.RESET}")
+        lines = _WRAPPER.wrap(text) or ['']
+    sys.stdout.write("".join(f"{color}{line}{reset}\n" for line in lines))
+
+# Streamed text splits into line breaks, whitespace runs and word pieces
+_STREAM_TOKEN_RE = re.compile(r'(\n|[^\S\n]+)')
+
+class StreamingWrapper:
+    """
+    Word-wrap streamed text as it arrives, writing each word as soon as it
+    is complete instead of waiting for the end of its line. For ordinary
+    text the output matches print_message.
+    """
+
+    def __init__(self, width=_WRAPPER.width):
+        self.width = width
+        self.col = 0            # characters written on the current line
+        self.started = False    # color code written for the current line
+        self.space = ''         # whitespace held until the next word
+        self.word = ''          # word still arriving
+
+    def _write_word(self, out):
+        word, space = self.word, self.space
+        if not word:
+            return
+        if self.col and self.col + len(space) + len(word) > self.width:
+            # Doesn't fit; wrapped lines never start with whitespace
+            out.append(f"{Colors.RESET}\n")
+            self.col, self.started, space = 0, False, ''
+        elif not self.col and len(space) + len(word) > self.width:
+            # Like TextWrapper, drop indentation that would push a word over
+            space = ''
+        if not self.started:
+            out.append(Colors.BRIGHT_WHITE)
+            self.started = True
+        out.append(space + word)
+        self.col += len(space) + len(word)
+        self.space = self.word = ''
+
+    def _end_line(self, out):
+        self._write_word(out)
+        if not self.started:
+            out.append(Colors.BRIGHT_WHITE)
+        out.append(f"{Colors.RESET}\n")
+        self.col, self.started, self.space = 0, False, ''
+
+    def feed(self, text):
+        """Add a chunk of streamed text, writing every word it completes"""
+        out = []
+        for token in _STREAM_TOKEN_RE.split(text):
+            if token == '\n':
+                self._end_line(out)
+            elif token and token.isspace():
+                self._write_word(out)
+                self.space += token
+            else:
+                self.word += token
+        if out:
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
+
+    def flush(self):
+        """Finish the last line, if anything is left on it"""
+        if self.started or self.space or self.word:
+            out = []
+            self._end_line(out)
+            sys.stdout.write("".join(out))
+
+def print_reply(text):
+    """Print a complete assistant reply exactly as it looked when streamed"""
+    wrapper = StreamingWrapper()
+    wrapper.feed(text)
+    wrapper.flush()
 
 def print_divider():
     """Print a subtle divider"""
-    print(f"{Colors.DIM}{Colors.BRIGHT_BLACK}{'─' * 80}{Colors.RESET}")
+    print(DIVIDER)
 
 def print_status(message, status_type='info'):
     """Print status messages"""
-    if status_type == 'success':
-        icon = '✓'
-        color = Colors.BRIGHT_GREEN
-    elif status_type == 'error':
-        icon = '✗'
-        color = Colors.BRIGHT_RED
-    elif status_type == 'info':
-        icon = 'ℹ'
-        color = Colors.BRIGHT_CYAN
-    else:
-        icon = '•'
-        color = Colors.BRIGHT_YELLOW
-
-    print(f"\n{color}{Colors.BOLD}{icon} {message}{Colors.RESET}\n")
+    prefix = _STATUS_PREFIXES.get(status_type, _DEFAULT_STATUS_PREFIX)
+    print(f"\n{prefix}{message}{Colors.RESET}\n")
 
 def print_thinking():
     """Print thinking indicator"""
-    print(f"{Colors.DIM}{Colors.BRIGHT_BLACK}  (thinking...){Colors.RESET}", end='', flush=True)
+    sys.stdout.write(THINKING)
+    sys.stdout.flush()
 
 def clear_line():
     """Clear the current line"""
@@ -137,78 +302,162 @@ def get_current_datetime():
 def execute_simple_command(command):
     """Execute a simple shell command"""
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        # Plain commands are exec'd directly; only shell syntax needs /bin/sh
+        args = None if _SHELL_SYNTAX_RE.search(command) else shlex.split(command)
+        try:
+            result = subprocess.run(
+                args or command, shell=args is None, capture_output=True, text=True, timeout=10
+            )
+        except FileNotFoundError:
+            # Not an executable (e.g. a shell builtin); let the shell handle it
+            result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=10)
         return result.stdout + result.stderr
     except Exception as e:
         return f"Error: {e}"
 
+def _load_web_libraries():
+    """Import the web search/parsing libraries once, reporting availability"""
+    global WEB_SEARCH_AVAILABLE, DDGS, BeautifulSoup, WEB_SESSION, WEB_SEARCH_CLIENT, HTML_PARSER, trafilatura
+    if WEB_SEARCH_AVAILABLE is None:
+        try:
+            from duckduckgo_search import DDGS
+            import requests
+            from requests.adapters import HTTPAdapter
+            from bs4 import BeautifulSoup
+        except ImportError:
+            WEB_SEARCH_AVAILABLE = False
+            return False
+
+        # Shared session for web fetches so repeat hosts reuse pooled connections
+        WEB_SESSION = requests.Session()
+        WEB_SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
+        web_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        WEB_SESSION.mount('http://', web_adapter)
+        WEB_SESSION.mount('https://', web_adapter)
+
+        # One search client for the session, so later queries reuse its
+        # connection to DuckDuckGo instead of handshaking again
+        WEB_SEARCH_CLIENT = DDGS()
+
+        # Prefer the C-based lxml parser for fetched pages when it is installed
+        try:
+            import lxml  # noqa: F401
+            HTML_PARSER = 'lxml'
+        except ImportError:
+            pass
+
+        # trafilatura extracts a page's main text in C (lxml), when installed
+        try:
+            import trafilatura
+        except ImportError:
+            pass
+
+        WEB_SEARCH_AVAILABLE = True
+    return WEB_SEARCH_AVAILABLE
+
 def web_search(query, max_results=5):
     """Search the web using DuckDuckGo"""
-    if not WEB_SEARCH_AVAILABLE:
+    if not _load_web_libraries():
         return {"error": "Web search not available. Install duckduckgo-search package."}
 
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            return {"results": results, "query": query}
+        results = list(WEB_SEARCH_CLIENT.text(query, max_results=max_results))
+        return {"results": results, "query": query}
     except Exception as e:
         return {"error": str(e)}
 
 def fetch_webpage(url):
     """Fetch and extract text from a webpage"""
-    if not WEB_SEARCH_AVAILABLE:
+    if not _load_web_libraries():
         return {"error": "Web fetching not available. Install requests and beautifulsoup4 packages."}
 
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = WEB_SESSION.get(url, timeout=10)
         response.raise_for_status()
+        html = response.text
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        text = ''
+        if trafilatura is not None:
+            # Main content only, without the script/style/whitespace passes
+            text = trafilatura.extract(html, include_comments=False, include_tables=False,
+                                       favor_precision=True) or ''
 
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
+        if text:
+            match = _TITLE_RE.search(html)
+            title = unescape(match.group(1).strip()) if match else "No title"
+        else:
+            soup = BeautifulSoup(html, HTML_PARSER)
 
-        # Get text
-        text = soup.get_text()
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
 
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
+            # Get text, one stripped phrase per line
+            text = '\n'.join(filter(None, _TEXT_BREAK_RE.split(soup.get_text().strip())))
+            title = soup.title.string if soup.title else "No title"
 
         # Limit length
-        if len(text) > 5000:
-            text = text[:5000] + "...[truncated]"
+        if len(text) > MAX_PAGE_CHARS:
+            text = text[:MAX_PAGE_CHARS] + "...[truncated]"
 
-        return {"url": url, "content": text, "title": soup.title.string if soup.title else "No title"}
+        return {"url": url, "content": text, "title": title}
     except Exception as e:
         return {"error": str(e), "url": url}
 
+def fetch_webpages(urls):
+    """Fetch several webpages concurrently, returning results in the same order"""
+    if not urls:
+        return {"pages": []}
+
+    # Fetches are network-bound, so threads overlap their round trips
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_FETCH_WORKERS)) as executor:
+        return {"pages": list(executor.map(fetch_webpage, urls))}
+
+def _iter_matches(directory, pattern):
+    """Lazily yield paths under directory whose name matches pattern, shallowest first"""
+    matcher = re.compile(fnmatch.translate(pattern)).match
+    # Like glob, hidden entries only match a pattern that starts with '.' and
+    # hidden directories are never searched
+    include_hidden = pattern.startswith('.')
+    pending = deque([directory])
+    while pending:
+        try:
+            entries = os.scandir(pending.popleft())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                hidden = name[0] == '.'
+                if matcher(name) and (include_hidden or not hidden):
+                    yield entry.path
+                try:
+                    if not hidden and name not in _SKIP_DIRS and entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                except OSError:
+                    pass
+
 def search_files(pattern, directory="."):
     """Search for files matching a pattern"""
     try:
-        files = glob.glob(os.path.join(directory, "**", pattern), recursive=True)
-        return {"files": files[:50], "pattern": pattern, "directory": directory}  # Limit to 50 results
+        # Stop walking as soon as enough matches are found
+        files = list(islice(_iter_matches(directory, pattern), MAX_FILE_RESULTS))
+        return {"files": files, "pattern": pattern, "directory": directory}
     except Exception as e:
         return {"error": str(e)}
 
 def read_file_content(file_path):
     """Read content from a file"""
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        # Read one character past the limit so truncation is detectable
+        # without loading the rest of the file
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read(MAX_READ_CHARS + 1)
         # Limit length
-        if len(content) > 10000:
-            content = content[:10000] + "...[truncated]"
-        return {"file_path": file_path, "content": content}
+        truncated = len(content) > MAX_READ_CHARS
+        if truncated:
+            content = content[:MAX_READ_CHARS] + "...[truncated]"
+        return {"file_path": file_path, "content": content, "truncated": truncated}
     except Exception as e:
         return {"error": str(e), "file_path": file_path}
 
@@ -227,6 +476,9 @@ def process_tool_call(tool_name, tool_input):
     elif tool_name == "fetch_webpage":
         url = tool_input.get("url")
         return fetch_webpage(url)
+    elif tool_name == "fetch_webpages":
+        urls = tool_input.get("urls", [])
+        return fetch_webpages(urls)
     elif tool_name == "search_files":
         pattern = tool_input.get("pattern")
         directory = tool_input.get("directory", ".")
@@ -236,6 +488,339 @@ def process_tool_call(tool_name, tool_input):
         return read_file_content(file_path)
     return {"error": "Unknown tool"}
 
+def dump_tool_result(result):
+    """Serialize a tool result for the tool_result message"""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result)
+
+def run_tool_calls(tool_uses):
+    """
+    Run every tool_use block from one response, returning tool_result blocks
+    in the same order. Tools are I/O-bound, so a thread pool overlaps them.
+    """
+    def call(block):
+        return process_tool_call(block.name, block.input)
+
+    if len(tool_uses) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(tool_uses))) as executor:
+            results = list(executor.map(call, tool_uses))
+    else:
+        results = [call(block) for block in tool_uses]
+
+    return [
+        {
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": dump_tool_result(result)
+        }
+        for block, result in zip(tool_uses, results)
+    ]
+
+def with_cache_breakpoint(messages):
+    """
+    Return messages with the final content block marked as a prompt cache
+    breakpoint, so the next turn can reuse everything up to it.
+
+    The history itself is left untouched; only the last message is copied.
+    """
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    marked = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    return messages[:-1] + [{**last, "content": list(content[:-1]) + [marked]}]
+
+def assistant_text(message):
+    """Text of an assistant message, whether stored as a string or SDK blocks"""
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(block.text for block in content if block.type == "text")
+
+def normalize_prompt(user_input):
+    """Prompt wording with case, spacing and trailing punctuation ignored"""
+    return ' '.join(user_input.lower().split()).rstrip('?.! ')
+
+def response_cache_key(user_input, conversation_history):
+    """
+    Key a question by its normalized wording and the assistant reply it
+    follows, or the summary it follows when no reply is left, so a cached
+    answer is only reused in the same context.
+    """
+    question = normalize_prompt(user_input)
+    previous = ''
+    for message in reversed(conversation_history):
+        if message["role"] == "assistant":
+            previous = assistant_text(message)
+            break
+        if is_prompt(message) and message["content"].startswith("[summary] "):
+            previous = message["content"]
+            break
+    return question, previous
+
+def route_model(client, user_input, route_cache):
+    """
+    Pick the model for a prompt with a tiny classification call to the fast
+    model. Decisions are cached by normalized wording, and any failure
+    falls back to the default model.
+    """
+    key = normalize_prompt(user_input)
+    model = route_cache.get(key)
+    if model is not None:
+        route_cache.move_to_end(key)
+        return model
+
+    try:
+        response = client.messages.create(
+            model=FAST_MODEL,
+            max_tokens=4,
+            system="Classify how hard the user's request is to answer well. "
+                   "Reply with one word: SIMPLE, NORMAL, or HARD",
+            messages=[{"role": "user", "content": user_input}]
+        )
+        verdict = assistant_text({"content": response.content}).strip().upper()
+    except Exception:
+        return DEFAULT_MODEL
+
+    model = ROUTE_MODELS.get(verdict, DEFAULT_MODEL)
+    route_cache[key] = model
+    if len(route_cache) > ROUTE_CACHE_SIZE:
+        route_cache.popitem(last=False)
+    return model
+
+def is_prompt(message):
+    """True for a plain user prompt, as opposed to a turn of tool results"""
+    return message["role"] == "user" and isinstance(message["content"], str)
+
+def render_transcript(messages):
+    """Plain-text transcript of messages, for the summarization prompt"""
+    lines = []
+    for message in messages:
+        content = message["content"]
+        if message["role"] == "assistant":
+            lines.append(f"Assistant: {assistant_text(message)}")
+        elif isinstance(content, str):
+            lines.append(f"User: {content}")
+        else:
+            for block in content:
+                lines.append(f"Tool result: {block['content'][:MAX_TOOL_RESULT_CHARS]}")
+    return "\n".join(lines)
+
+def summarize_history(client, conversation_history, keep=HISTORY_KEEP_TURNS):
+    """
+    Replace all but the last `keep` exchanges with a single summary message,
+    in place. Returns False when there is nothing older to summarize.
+    """
+    prompts = [i for i, message in enumerate(conversation_history) if is_prompt(message)]
+    if len(prompts) <= keep:
+        return False
+    cut = prompts[-keep] if keep else len(conversation_history)
+
+    response = client.messages.create(
+        model=FAST_MODEL,
+        max_tokens=512,
+        messages=[{
+            "role": "user",
+            "content": "Summarize this conversation so it can be continued, "
+                       "keeping names, numbers and conclusions:\n\n"
+                       + render_transcript(conversation_history[:cut])
+        }]
+    )
+    summary = assistant_text({"content": response.content})
+    conversation_history[:cut] = [{"role": "user", "content": "[summary] " + summary}]
+    return True
+
+def elide_tool_results(conversation_history):
+    """
+    Shorten large tool results in every exchange but the latest, in place.
+    Claude has already answered from them, so only a marker is kept.
+    """
+    latest = max((i for i, message in enumerate(conversation_history) if is_prompt(message)), default=0)
+    for message in conversation_history[:latest]:
+        if message["role"] != "user" or isinstance(message["content"], str):
+            continue
+        for block in message["content"]:
+            if len(block["content"]) > MAX_TOOL_RESULT_CHARS:
+                block["content"] = f"[tool_result elided, id={block['tool_use_id']}]"
+
+def compact_history(client, conversation_history):
+    """Keep per-turn input bounded after each completed exchange"""
+    elide_tool_results(conversation_history)
+    if sum(1 for message in conversation_history if is_prompt(message)) <= 2 * HISTORY_KEEP_TURNS:
+        return
+    try:
+        summarize_history(client, conversation_history)
+    except Exception:
+        # Without a summary, fall back to dropping the older exchanges
+        prompts = [i for i, message in enumerate(conversation_history) if is_prompt(message)]
+        del conversation_history[:prompts[-HISTORY_KEEP_TURNS]]
+
+# Tool definitions sent with every request; built once at import
+TOOLS = [
+    {
+        "name": "get_current_datetime",
+        "description": "Get the current date and time. Use this when the user asks about the current date, time, day of week, etc.",
+        "input_schema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "web_search",
+        "description": "Search the web using DuckDuckGo. Use this to find current information, news, facts, or anything not in your knowledge. Returns search results with titles, URLs, and snippets.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The search query"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return (default: 5)",
+                    "default": 5
+                }
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "fetch_webpage",
+        "description": "Fetch and read the content of a specific webpage. Use this to get detailed information from a known URL or to read the content of search results.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL of the webpage to fetch"
+                }
+            },
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "fetch_webpages",
+        "description": "Fetch and read several webpages at once. Prefer this over repeated fetch_webpage calls when you need the content of multiple URLs, such as several search results.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "urls": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The URLs of the webpages to fetch"
+                }
+            },
+            "required": ["urls"]
+        }
+    },
+    {
+        "name": "search_files",
+        "description": "Search for files matching a pattern in a directory. Supports wildcards like *.py, *.txt, etc.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "description": "File pattern to search for (e.g., '*.py', 'config.*')"
+                },
+                "directory": {
+                    "type": "string",
+                    "description": "Directory to search in (default: current directory)",
+                    "default": "."
+                }
+            },
+            "required": ["pattern"]
+        }
+    },
+    {
+        "name": "read_file",
+        "description": "Read the content of a file. Use this to examine file contents, read configuration files, or analyze code.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path to the file to read"
+                }
+            },
+            "required": ["file_path"]
+        }
+    },
+    {
+        "name": "execute_command",
+        "description": "Execute a shell command to get system information (like uptime, disk usage, etc). Use for simple, safe commands only.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "The shell command to execute"
+                }
+            },
+            "required": ["command"]
+        },
+        # Tool definitions never change, so cache them as a prompt prefix
+        "cache_control": {"type": "ephemeral"}
+    }
+]
+
+def run_exchange(client, model, conversation_history):
+    """
+    Get Claude's answer to the prompt at the end of the history, running
+    tool rounds until it replies without tools.
+
+    Each round adds exactly one assistant message and, when tools were
+    requested, one user message holding all of their results. Returns the
+    final assistant message, whether any text was shown, and whether any
+    tools ran.
+    """
+    used_tools = False
+    while True:
+        # Stream the reply so text appears as it arrives; each word is
+        # wrapped and printed as soon as it is complete
+        has_text = False
+        wrapper = StreamingWrapper()
+        with client.messages.stream(
+            model=model,
+            max_tokens=4096,
+            system=SYSTEM_PROMPT,
+            tools=TOOLS,
+            messages=with_cache_breakpoint(conversation_history)
+        ) as stream:
+            for text in stream.text_stream:
+                if not has_text:
+                    # Clear thinking indicator and print assistant prompt only once
+                    clear_line()
+                    print_assistant_prompt()
+                    has_text = True
+                wrapper.feed(text)
+            response = stream.get_final_message()
+
+        wrapper.flush()
+        if not has_text:
+            clear_line()
+
+        # Tool inputs arrive fully parsed
+        assistant_message = {"role": "assistant", "content": response.content}
+        conversation_history.append(assistant_message)
+
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        if not tool_uses:
+            return assistant_message, has_text, used_tools
+
+        # Run every requested tool at once and answer them in one turn
+        used_tools = True
+        conversation_history.append({
+            "role": "user",
+            "content": run_tool_calls(tool_uses)
+        })
+
+        # Show thinking indicator for next iteration
+        print()
+        print_thinking()
+
 def main():
     # Get API key from environment variable
     api_key = os.environ.get('ANTHROPIC_API_KEY')
@@ -246,128 +831,38 @@ def main():
         print(f"  {Colors.CYAN}export ANTHROPIC_API_KEY=your-api-key-here{Colors.RESET}")
         sys.exit(1)
 
+    # Imported here so startup stays fast and a missing key fails immediately
+    import anthropic
+
     # Create Anthropic client
     client = anthropic.Anthropic(api_key=api_key)
 
-    # Define available tools
-    tools = [
-        {
-            "name": "get_current_datetime",
-            "description": "Get the current date and time. Use this when the user asks about the current date, time, day of week, etc.",
-            "input_schema": {
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        },
-        {
-            "name": "web_search",
-            "description": "Search the web using DuckDuckGo. Use this to find current information, news, facts, or anything not in your knowledge. Returns search results with titles, URLs, and snippets.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query"
-                    },
-                    "max_results": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return (default: 5)",
-                        "default": 5
-                    }
-                },
-                "required": ["query"]
-            }
-        },
-        {
-            "name": "fetch_webpage",
-            "description": "Fetch and read the content of a specific webpage. Use this to get detailed information from a known URL or to read the content of search results.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL of the webpage to fetch"
-                    }
-                },
-                "required": ["url"]
-            }
-        },
-        {
-            "name": "search_files",
-            "description": "Search for files matching a pattern in a directory. Supports wildcards like *.py, *.txt, etc.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "pattern": {
-                        "type": "string",
-                        "description": "File pattern to search for (e.g., '*.py', 'config.*')"
-                    },
-                    "directory": {
-                        "type": "string",
-                        "description": "Directory to search in (default: current directory)",
-                        "default": "."
-                    }
-                },
-                "required": ["pattern"]
-            }
-        },
-        {
-            "name": "read_file",
-            "description": "Read the content of a file. Use this to examine file contents, read configuration files, or analyze code.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "file_path": {
-                        "type": "string",
-                        "description": "Path to the file to read"
-                    }
-                },
-                "required": ["file_path"]
-            }
-        },
-        {
-            "name": "execute_command",
-            "description": "Execute a shell command to get system information (like uptime, disk usage, etc). Use for simple, safe commands only.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The shell command to execute"
-                    }
-                },
-                "required": ["command"]
-            }
-        }
-    ]
-
     # Conversation history
     conversation_history = []
 
+    # (question, previous reply) -> answer, for turns answered without tools
+    response_cache = OrderedDict()
+
+    # normalized prompt -> model chosen for it
+    route_cache = OrderedDict()
+
     # Print welcome header
     print_header()
 
     while True:
         # Get user input
         try:
-            user_input = input(print_user_prompt()).strip()
+            user_input = input(USER_PROMPT).strip()
         except (EOFError, KeyboardInterrupt):
             print()
             print()
-            print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}")
-            print(f"{Colors.BRIGHT_CYAN}  Goodbye! 👋 Thanks for chatting!{Colors.RESET}")
-            print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}")
-            print()
+            print_goodbye()
             break
 
         # Check for exit commands
         if user_input.lower() in ['exit', 'quit', 'bye', 'q']:
             print()
-            print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}")
-            print(f"{Colors.BRIGHT_CYAN}  Goodbye! 👋 Thanks for chatting!{Colors.RESET}")
-            print(f"{Colors.BOLD}{Colors.BRIGHT_CYAN}{'═' * 80}{Colors.RESET}")
-            print()
+            print_goodbye()
             break
 
         # Check for clear command
@@ -377,11 +872,41 @@ def main():
             print_status("Conversation cleared. Starting fresh!", 'success')
             continue
 
+        # Check for summarize command
+        if user_input.lower() == '/summarize':
+            print()
+            print_thinking()
+            try:
+                summarized = summarize_history(client, conversation_history, keep=0)
+            except Exception as e:
+                clear_line()
+                print_status(f'Error: {e}', 'error')
+                continue
+            clear_line()
+            if summarized:
+                print_status("Conversation summarized.", 'success')
+            else:
+                print_status("Nothing to summarize yet.", 'info')
+            continue
+
         # Skip empty input
         if not user_input:
             continue
 
+        # A repeated question in the same context is answered locally
+        cache_key = response_cache_key(user_input, conversation_history)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            response_cache.move_to_end(cache_key)
+            conversation_history.append({"role": "user", "content": user_input})
+            conversation_history.append({"role": "assistant", "content": cached})
+            print_assistant_prompt()
+            print_reply(cached)
+            print()
+            continue
+
         # Add user message to conversation history
+        start = len(conversation_history)
         conversation_history.append({
             "role": "user",
             "content": user_input
@@ -391,71 +916,29 @@ def main():
         print()
         print_thinking()
 
-        # Main conversation loop with tool use
-        while True:
-            try:
-                # Send message to Claude with tools
-                response = client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
-                    max_tokens=4096,
-                    tools=tools,
-                    messages=conversation_history
-                )
-
-                # Clear thinking indicator
-                clear_line()
+        # Trivial prompts go to the fast model; tool rounds keep the same one
+        model = route_model(client, user_input, route_cache)
+
+        try:
+            reply, has_text, used_tools = run_exchange(client, model, conversation_history)
+        except Exception as e:
+            clear_line()
+            print_status(f'Error: {e}', 'error')
+            # Roll back the whole exchange so no tool_use is left unanswered
+            del conversation_history[start:]
+            continue
 
-                # Process the response
-                assistant_message = {"role": "assistant", "content": []}
-                has_text = False
-
-                for block in response.content:
-                    if block.type == "text":
-                        if not has_text:
-                            # Print assistant prompt only once
-                            print_assistant_prompt()
-                            has_text = True
-                        print_message(block.text, is_user=False)
-                        assistant_message["content"].append(block)
-
-                    elif block.type == "tool_use":
-                        # Add tool use to message
-                        assistant_message["content"].append(block)
-
-                        # Process the tool call silently
-                        result = process_tool_call(block.name, block.input)
-
-                        # Add assistant message with tool use
-                        conversation_history.append(assistant_message)
-
-                        # Add tool result
-                        conversation_history.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": json.dumps(result)
-                            }]
-                        })
-
-                        # Show thinking indicator for next iteration
-                        print()
-                        print_thinking()
-
-                        # Continue the loop to get Claude's response to the tool result
-                        break
-                else:
-                    # No tool use, end the loop
-                    if has_text:
-                        print()
-                    conversation_history.append(assistant_message)
-                    break
+        if has_text:
+            print()
 
-            except Exception as e:
-                clear_line()
-                print_status(f'Error: {e}', 'error')
-                conversation_history.pop()
-                break
+        # Tool answers depend on live data, so only cache plain replies
+        if has_text and not used_tools:
+            response_cache[cache_key] = assistant_text(reply)
+            if len(response_cache) > RESPONSE_CACHE_SIZE:
+                response_cache.popitem(last=False)
+
+        # Bound what the next turn sends
+        compact_history(client, conversation_history)
 
 if __name__ == '__main__':
     main()
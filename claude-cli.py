@@ -3,7 +3,6 @@
 
 import os
 import sys
-import anthropic
 
 def main():
     # Get API key from environment variable
@@ -30,6 +29,10 @@ def main():
 
     prompt = ' '.join(sys.argv[1:])
 
+    # Imported only once the key and prompt are known to be present; the SDK
+    # is slow to import and usage errors should not wait on it
+    import anthropic
+
     # Create Anthropic client
     client = anthropic.Anthropic(api_key=api_key)
 
@@ -5,10 +5,15 @@ Secure configuration with environment variable validation
 """
 
 import os
+import ssl
 import logging
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Union
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,6 +22,40 @@ class ConfigurationError(Exception):
     pass
 
 
+class SSLContextAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections all share one pre-built SSL context.
+
+    The context already holds the trusted CAs, so the bundle is not
+    re-read from disk for every new connection.
+    """
+
+    def __init__(self, ssl_context, **kwargs):
+        # Set before super().__init__, which builds the pool manager
+        self._ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self._ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs["ssl_context"] = self._ssl_context
+        return super().proxy_manager_for(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        # The context decides verification. Passing a CA bundle path would
+        # make urllib3 load it again, and REQUESTS_CA_BUNDLE would override
+        # a disabled session.verify
+        kwargs["verify"] = self._ssl_context.verify_mode != ssl.CERT_NONE
+        return super().send(request, **kwargs)
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        conn.ca_certs = None
+        conn.ca_cert_dir = None
+
+
 class Settings:
     """
     Application configuration loaded from environment variables.
@@ -25,10 +64,24 @@ class Settings:
     No default credentials are allowed.
     """
 
+    # Fixed attribute set: no per-instance __dict__, and a misspelled
+    # attribute assignment fails instead of passing silently
+    __slots__ = (
+        "infoblox_host", "infoblox_user", "infoblox_password", "wapi_version",
+        "infoblox_verify_ssl", "infoblox_ca_bundle", "infoblox_auto_confirm",
+        "anthropic_api_key", "rag_db_path", "rag_collection_name",
+        "log_level", "log_file", "enable_security_audit",
+        "app_name", "app_version", "_base_url", "_ssl_context", "_session",
+    )
+
     def __init__(self):
         """Initialize settings from environment variables"""
         self._load_settings()
         self._validate_settings()
+        self._base_url = f"https://{self.infoblox_host}/wapi/{self.wapi_version}"
+        # Built on first use, so a bad CA path only fails when it is needed
+        self._ssl_context = None
+        self._session = None
 
     def _load_settings(self):
         """Load all settings from environment variables"""
@@ -43,6 +96,9 @@ class Settings:
         self.infoblox_verify_ssl = os.getenv("INFOBLOX_VERIFY_SSL", "true").lower() == "true"
         self.infoblox_ca_bundle = os.getenv("INFOBLOX_CA_BUNDLE")
 
+        # API Confirmation (skip the interactive preview for scripted/batch runs)
+        self.infoblox_auto_confirm = os.getenv("INFOBLOX_AUTO_CONFIRM", "false").lower() in ("1", "true")
+
         # Anthropic Configuration (REQUIRED)
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
 
@@ -98,7 +154,7 @@ class Settings:
 
     def get_infoblox_base_url(self) -> str:
         """Get InfoBlox WAPI base URL"""
-        return f"https://{self.infoblox_host}/wapi/{self.wapi_version}"
+        return self._base_url
 
     def get_ssl_verify(self) -> Union[bool, str]:
         """
@@ -113,6 +169,43 @@ class Settings:
             return self.infoblox_ca_bundle
         return self.infoblox_verify_ssl
 
+    def get_ssl_context(self) -> ssl.SSLContext:
+        """
+        Get an SSL context matching get_ssl_verify(), built once.
+
+        Loading a CA bundle parses the whole PEM file, so it is done here a
+        single time rather than for every connection.
+        """
+        if self._ssl_context is None:
+            if self.infoblox_ca_bundle:
+                context = ssl.create_default_context(cafile=self.infoblox_ca_bundle)
+            elif self.infoblox_verify_ssl:
+                # Same CA bundle requests verifies against by default
+                context = ssl.create_default_context(cafile=requests.certs.where())
+            else:
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._ssl_context = context
+        return self._ssl_context
+
+    def get_session(self) -> requests.Session:
+        """
+        Get the shared authenticated WAPI session.
+
+        Connections are pooled and all use get_ssl_context(), so TLS setup
+        work is shared by every caller.
+        """
+        if self._session is None:
+            session = requests.Session()
+            session.auth = (self.infoblox_user, self.infoblox_password)
+            session.verify = self.get_ssl_verify()
+            adapter = SSLContextAdapter(self.get_ssl_context())
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
     def display_security_warning(self):
         """Display warning if SSL verification is disabled"""
         if not self.infoblox_verify_ssl and not self.infoblox_ca_bundle:
@@ -143,24 +236,21 @@ class Settings:
         )
 
 
-# Global settings instance
-_settings: Optional[Settings] = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get or create global settings instance.
 
+    The instance is cached after the first successful load; call
+    ``get_settings.cache_clear()`` to force a reload.
+
     Returns:
         Settings instance
 
     Raises:
         ConfigurationError: If required environment variables are missing
     """
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
 
 
 # Convenience function for backward compatibility
@@ -10,15 +10,45 @@ import os
 import subprocess
 import sys
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# Parsed config files: path -> (st_mtime_ns, {section: {key: raw value}}),
+# with the file's [DEFAULT] kept under its own key
+_CONFIG_CACHE = {}
+
+
+def read_config_file(path):
+    """
+    Return the raw sections of an INI file, parsing it again only when its
+    modification time changes. Callers get their own copy to modify.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _CONFIG_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        parser = configparser.ConfigParser()
+        parser.read(path)
+        # Keep [DEFAULT] as its own entry so read_dict() applies it to every
+        # section, including the built-in ones the file does not mention.
+        sections = {parser.default_section: dict(parser.defaults())}
+        for section in parser.sections():
+            sections[section] = {
+                key: parser.get(section, key, raw=True)
+                for key in parser._sections[section]
+            }
+        cached = _CONFIG_CACHE[path] = (mtime, sections)
+    return {section: dict(values) for section, values in cached[1].items()}
+
 class DeploymentManager:
     """Manages deployment to target systems"""
 
     def __init__(self, config_file="deploy-config.ini"):
         self.config_file = config_file
         self.config = self.load_config()
+        # Interpreter path -> "Python X.Y.Z", filled by get_python_version
+        self._python_versions = {}
 
     def load_config(self):
         """Load configuration from file"""
@@ -49,7 +79,7 @@ class DeploymentManager:
 
         # Override with file config if exists
         if os.path.exists(self.config_file):
-            config.read(self.config_file)
+            config.read_dict(read_config_file(os.path.abspath(self.config_file)))
             print(f"✓ Loaded configuration from {self.config_file}")
         else:
             print(f"ℹ Using default configuration (no {self.config_file} found)")
@@ -83,33 +113,59 @@ class DeploymentManager:
 
         for candidate in candidates:
             python_path = shutil.which(candidate)
-            if python_path:
-                # Verify it's Python 3.x
-                try:
-                    result = subprocess.run(
-                        [python_path, "--version"],
-                        capture_output=True,
-                        text=True
-                    )
-                    version_str = result.stdout.strip()
-                    if "Python 3." in version_str:
-                        return python_path
-                except:
-                    continue
+            # Verify it's Python 3.x; a name alone can't be trusted, since
+            # pyenv shims exist for versions that aren't installed
+            if python_path and "Python 3." in self.get_python_version(python_path):
+                return python_path
 
         return None
 
     def get_python_version(self, python_exec):
-        """Get Python version string"""
-        try:
-            result = subprocess.run(
-                [python_exec, "--version"],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout.strip()
-        except:
-            return "Unknown"
+        """Get Python version string, starting each interpreter at most once"""
+        version = self._python_versions.get(python_exec)
+        if version is None:
+            try:
+                result = subprocess.run(
+                    [python_exec, "--version"],
+                    capture_output=True,
+                    text=True
+                )
+                version = result.stdout.strip()
+            except:
+                version = "Unknown"
+            self._python_versions[python_exec] = version
+        return version
+
+    def write_tarball(self, package_name, files, compressor):
+        """
+        Stream `tar cf -` straight into a compressor command writing
+        package_name, so archiving and compression overlap.
+
+        Raises CalledProcessError (with stderr) if either side fails; the
+        partial package is removed.
+        """
+        with open(package_name, 'wb') as out, tempfile.TemporaryFile() as tar_err:
+            # tar's errors go to a file, so a full stderr pipe can't stall it
+            tar = subprocess.Popen(["tar", "cf", "-"] + files,
+                                   stdout=subprocess.PIPE, stderr=tar_err)
+            compress = subprocess.Popen(compressor, stdin=tar.stdout, stdout=out,
+                                        stderr=subprocess.PIPE)
+            # Only the compressor reads the pipe now; if it dies, tar gets SIGPIPE
+            tar.stdout.close()
+            compress_err = compress.communicate()[1]
+            tar.wait()
+
+            # A compressor failure comes first: it also kills tar with SIGPIPE
+            failed = None
+            if compress.returncode:
+                failed = (compress.returncode, compressor, compress_err)
+            elif tar.returncode:
+                tar_err.seek(0)
+                failed = (tar.returncode, tar.args, tar_err.read())
+
+        if failed:
+            os.remove(package_name)
+            raise subprocess.CalledProcessError(*failed[:2], stderr=failed[2])
 
     def create_deployment_package(self):
         """Create deployment tarball"""
@@ -139,10 +195,14 @@ class DeploymentManager:
             if os.path.exists(env_file):
                 files_to_deploy.append(env_file)
 
-        # Create tarball
-        cmd = ["tar", "czf", package_name] + files_to_deploy
+        # Create tarball; pigz writes the same gzip format using every core
+        pigz = shutil.which("pigz")
         try:
-            subprocess.run(cmd, check=True, stderr=subprocess.PIPE)
+            if pigz:
+                self.write_tarball(package_name, files_to_deploy, [pigz, "-p", str(os.cpu_count() or 1)])
+            else:
+                subprocess.run(["tar", "czf", package_name] + files_to_deploy,
+                               check=True, stderr=subprocess.PIPE)
             size = os.path.getsize(package_name) / 1024
             print(f"✓ Created deployment package: {package_name} ({size:.1f} KB)")
             return package_name
@@ -254,11 +314,16 @@ class DeploymentManager:
             ("python3.12", "Python 3.12"),
         ]
 
+        paths = [shutil.which(cmd) for cmd, _ in versions_to_check]
+
+        # Interpreter start-up dominates; start them all at once
+        with ThreadPoolExecutor(max_workers=len(versions_to_check)) as executor:
+            versions = list(executor.map(
+                lambda path: self.get_python_version(path) if path else None, paths))
+
         found_versions = []
-        for cmd, label in versions_to_check:
-            path = shutil.which(cmd)
+        for (cmd, label), path, version in zip(versions_to_check, paths, versions):
             if path:
-                version = self.get_python_version(path)
                 found_versions.append((label, path, version))
                 print(f"✓ {label:30s} {path:40s} {version}")
             else:
@@ -26,19 +26,105 @@ security_logger = get_security_logger()
 # Display SSL warning if disabled
 settings.display_security_warning()
 
-import requests
+import argparse
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Any
 
+import requests
+
+from config import SSLContextAdapter
+
+# orjson parses and writes the large schema documents much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# With httpx and h2 installed, parallel probes multiplex over one HTTP/2
+# connection instead of each holding its own HTTP/1.1 connection
+try:
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
 # InfoBlox configuration moved to config.py
 BASE_URL = settings.get_infoblox_base_url()
 
+# Object types probed at once during discovery
+MAX_PROBE_WORKERS = 16
+
+# Schemas only change with the server's WAPI version, so they are kept on
+# disk per host and version and reused for a day
+SCHEMA_CACHE_DIR = os.path.join(
+    os.path.expanduser("~/.cache/infoblox-explorer"),
+    f"{settings.infoblox_host}-{settings.wapi_version}".replace(os.sep, "_").replace(":", "_")
+)
+SCHEMA_CACHE_TTL = 24 * 3600
+
+def load_json(data):
+    """Parse a JSON document from bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _schema_cache_path(object_type):
+    return os.path.join(SCHEMA_CACHE_DIR, f"{object_type.replace(':', '_')}.json")
+
+def load_cached_schema(object_type):
+    """Return the cached schema for an object type, or None if missing or stale"""
+    path = _schema_cache_path(object_type)
+    try:
+        if time.time() - os.path.getmtime(path) > SCHEMA_CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            return load_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+def save_cached_schema(object_type, content):
+    """Store a schema response body; a failed write only costs a refetch"""
+    path = _schema_cache_path(object_type)
+    try:
+        os.makedirs(SCHEMA_CACHE_DIR, exist_ok=True)
+        # Write then rename, so a concurrent or interrupted run never reads half a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache schema for {object_type}: {e}")
+
 def get_wapi_session():
-    """Create authenticated session for WAPI"""
+    """Get an authenticated session for WAPI, using HTTP/2 when available"""
     logger.info("Creating WAPI session")
+    if httpx is not None:
+        return httpx.Client(
+            auth=(settings.infoblox_user, settings.infoblox_password),
+            verify=settings.get_ssl_context(),
+            http2=True,
+            # Requests without their own timeout get requests' patience,
+            # not httpx's 5 second default
+            timeout=30,
+            limits=httpx.Limits(max_connections=MAX_PROBE_WORKERS,
+                                max_keepalive_connections=MAX_PROBE_WORKERS),
+        )
+
+    # A private session rather than settings.get_session(), so the pool
+    # sizing below does not leak into other users of the shared session
     session = requests.Session()
     session.auth = (settings.infoblox_user, settings.infoblox_password)
     session.verify = settings.get_ssl_verify()
+    # One pooled connection per probe worker, so parallel probes never wait
+    # for a free connection
+    adapter = SSLContextAdapter(settings.get_ssl_context(),
+                                pool_connections=4, pool_maxsize=MAX_PROBE_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     return session
 
 def get_supported_objects(session):
@@ -65,28 +151,40 @@ def get_supported_objects(session):
     ]
     return common_objects
 
-def get_object_schema(session, object_type):
-    """Get schema for a specific object type"""
+def get_object_schema(session, object_type, refresh=False):
+    """
+    Get schema for a specific object type.
+
+    The schema request doubles as the existence check: WAPI answers 400/404
+    for unknown types. Returns (exists, schema), with schema None when the
+    type exists but its schema could not be read. Cached schemas are used
+    unless refresh is set.
+    """
+    if not refresh:
+        schema = load_cached_schema(object_type)
+        if schema is not None:
+            return True, schema
+
     url = f"{BASE_URL}/{object_type}?_schema"
     try:
         response = session.get(url, timeout=10)
-        if response.status_code == 200:
-            return response.json()
     except Exception as e:
         print(f"Error getting schema for {object_type}: {e}")
-    return None
-
-def test_object_exists(session, object_type):
-    """Test if an object type exists by querying it"""
-    url = f"{BASE_URL}/{object_type}?_max_results=1"
-    try:
-        response = session.get(url, timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+        return False, None
+    if response.status_code in (400, 404):
+        return False, None
+    if response.status_code == 200:
+        try:
+            schema = load_json(response.content)
+        except ValueError as e:
+            print(f"Error getting schema for {object_type}: {e}")
+        else:
+            save_cached_schema(object_type, response.content)
+            return True, schema
+    return True, None
 
-def discover_wapi_objects(session):
-    """Discover all available WAPI objects"""
+def discover_wapi_objects(session, refresh=False):
+    """Discover all available WAPI objects; refresh ignores cached schemas"""
     logger.info("Starting WAPI object discovery")
     print("=" * 80)
     print("InfoBlox WAPI Object Discovery")
@@ -103,25 +201,25 @@ def discover_wapi_objects(session):
 
     discovered = {}
 
-    for obj_type in objects:
-        print(f"Testing: {obj_type:30s} ", end='', flush=True)
+    # Probes are independent round trips, so run them concurrently; results
+    # come back in the original order to keep the report stable
+    with ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS) as executor:
+        for obj_type, (exists, schema) in zip(objects, executor.map(partial(get_object_schema, session, refresh=refresh), objects)):
+            print(f"Testing: {obj_type:30s} ", end='')
 
-        # Test if object exists
-        if test_object_exists(session, obj_type):
-            print("✓ EXISTS", end='')
+            if exists:
+                print("✓ EXISTS", end='')
 
-            # Try to get schema
-            schema = get_object_schema(session, obj_type)
-            if schema:
-                discovered[obj_type] = schema
-                # Count fields
-                fields = schema.get('fields', [])
-                print(f" - {len(fields)} fields")
+                if schema:
+                    discovered[obj_type] = schema
+                    # Count fields
+                    fields = schema.get('fields', [])
+                    print(f" - {len(fields)} fields")
+                else:
+                    discovered[obj_type] = {"exists": True, "schema": None}
+                    print(" - No schema available")
             else:
-                discovered[obj_type] = {"exists": True, "schema": None}
-                print(" - No schema available")
-        else:
-            print("✗ Not found")
+                print("✗ Not found")
 
     return discovered
 
@@ -138,14 +236,23 @@ def get_grid_schema(session):
 
 def export_schemas(discovered, filename="infoblox_schemas.json"):
     """Export discovered schemas to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(discovered, f, indent=2)
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(discovered, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, 'w') as f:
+            json.dump(discovered, f, indent=2)
     print()
     print(f"✓ Exported schemas to {filename}")
     print(f"  Total objects discovered: {len(discovered)}")
     print(f"  Objects with full schema: {sum(1 for v in discovered.values() if isinstance(v, dict) and 'fields' in v)}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Discover InfoBlox WAPI objects and their schemas")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Fetch every schema again instead of using the on-disk cache")
+    args = parser.parse_args()
+
     session = get_wapi_session()
 
     # Test connection
@@ -164,7 +271,7 @@ def main():
         return
 
     # Discover objects
-    discovered = discover_wapi_objects(session)
+    discovered = discover_wapi_objects(session, refresh=args.refresh_cache)
 
     # Export results
     export_schemas(discovered, "/Users/tshoush/REDHAT/infoblox_schemas.json")
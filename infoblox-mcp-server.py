@@ -22,7 +22,7 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, GetPromptResult, Prompt, PromptMessage
 
 # Import security modules
-from config import get_settings
+from config import get_settings, SSLContextAdapter
 from logging_config import setup_logging, get_security_logger, log_tool_execution
 from validators import InputValidator, ValidationError
 
@@ -67,6 +67,10 @@ class InfoBloxClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         })
+        # Connections share one SSL context, so a CA bundle is parsed once
+        adapter = SSLContextAdapter(settings.get_ssl_context())
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         logger.info(f"InfoBlox client initialized (host={settings.infoblox_host})")
 
     @sleep_and_retry
@@ -340,10 +340,8 @@ class InfoBloxRAGBuilder:
         doc_url = f"https://{settings.infoblox_host}/wapidoc/"
 
         try:
-            response = requests.get(
+            response = settings.get_session().get(
                 doc_url,
-                auth=(settings.infoblox_user, settings.infoblox_password),
-                verify=settings.get_ssl_verify(),
                 timeout=10
             )
 
@@ -367,14 +365,10 @@ class InfoBloxRAGBuilder:
         logger.info("Discovering extensible attributes from InfoBlox")
 
         try:
-            import requests
-
             url = f"https://{settings.infoblox_host}/wapi/{settings.wapi_version}/extensibleattributedef"
             logger.debug(f"Fetching EAs from: {url}")
-            response = requests.get(
+            response = settings.get_session().get(
                 url,
-                auth=(settings.infoblox_user, settings.infoblox_password),
-                verify=settings.get_ssl_verify(),
                 params={"_return_fields": "name,comment,type,list_values"},
                 timeout=30
             )
@@ -6,7 +6,6 @@ Comprehensive IP address lookup for operations teams
 
 import ipaddress
 from typing import Dict, Optional, Any, List
-import requests
 from config import get_settings
 from validators import InputValidator
 
@@ -15,9 +14,7 @@ class IPInfoClient:
 
     def __init__(self):
         self.settings = get_settings()
-        self.session = requests.Session()
-        self.session.auth = (self.settings.infoblox_user, self.settings.infoblox_password)
-        self.session.verify = self.settings.get_ssl_verify()
+        self.session = self.settings.get_session()
         self.base_url = self.settings.get_infoblox_base_url()
 
     def find_ip_detailed(self, ip_address: str) -> Dict[str, Any]:
@@ -0,0 +1,146 @@
+"""
+Unit tests for api_confirmation module
+"""
+
+import pytest
+from config import get_settings
+from api_confirmation import APICallConfirmation
+
+
+@pytest.fixture
+def confirmation(mock_env_vars, monkeypatch):
+    """APICallConfirmation bound to the mocked environment"""
+    monkeypatch.delenv("INFOBLOX_AUTO_CONFIRM", raising=False)
+    get_settings.cache_clear()
+    yield APICallConfirmation()
+    get_settings.cache_clear()
+
+
+class TestMapToolToApiCall:
+    """Tests for tool -> API call mapping"""
+
+    def test_list_networks(self, confirmation):
+        """Test list networks maps to GET network with paging params"""
+        api_info = confirmation.map_tool_to_api_call(
+            "infoblox_list_networks", {"max_results": 5, "return_fields": "network,comment"}
+        )
+
+        assert api_info["method"] == "GET"
+        assert api_info["path"] == "network"
+        assert api_info["params"] == {"_max_results": 5, "_return_fields": "network,comment"}
+        assert api_info["data"] is None
+
+    def test_search_records_path(self, confirmation):
+        """Test record searches map to record:<type>"""
+        api_info = confirmation.map_tool_to_api_call(
+            "infoblox_search_records", {"record_type": "cname", "name": "www.example.com"}
+        )
+
+        assert api_info["path"] == "record:cname"
+        assert api_info["params"]["name"] == "www.example.com"
+        assert api_info["description"] == "Search CNAME DNS records"
+
+    def test_create_network_body(self, confirmation):
+        """Test create network builds a POST body including extra fields"""
+        api_info = confirmation.map_tool_to_api_call(
+            "infoblox_create_network", {"network": "10.0.0.0/24", "comment": "lab", "network_view": "default"}
+        )
+
+        assert api_info["method"] == "POST"
+        assert api_info["data"] == {"network": "10.0.0.0/24", "comment": "lab", "network_view": "default"}
+
+    def test_unknown_tool(self, confirmation):
+        """Test unknown tools fall back to a generic description"""
+        api_info = confirmation.map_tool_to_api_call("not_a_tool", {})
+
+        assert api_info["path"] == "<unknown>"
+        assert api_info["description"] == "Execute not_a_tool"
+
+
+class TestGenerateCurlCommand:
+    """Tests for curl command generation"""
+
+    def test_masks_password(self, confirmation):
+        """Test curl command never contains the password"""
+        api_info = confirmation.map_tool_to_api_call("infoblox_list_networks", {})
+
+        curl = confirmation.generate_curl_command(api_info)
+
+        assert "testpass" not in curl
+        assert "-u testuser:$INFOBLOX_PASSWORD" in curl
+
+    def test_query_string_is_encoded(self, confirmation):
+        """Test query parameter values are percent-encoded"""
+        api_info = confirmation.map_tool_to_api_call(
+            "infoblox_query", {"object_type": "record:host", "filters": {"name~": "a b&c"}, "max_results": 10}
+        )
+
+        curl = confirmation.generate_curl_command(api_info)
+
+        assert "https://test.infoblox.local/wapi/v2.13.1/record:host?_max_results=10&name~=a+b%26c" in curl
+
+    def test_post_includes_body(self, confirmation):
+        """Test POST requests include a JSON body"""
+        api_info = confirmation.map_tool_to_api_call("infoblox_create_network", {"network": "10.0.0.0/24"})
+
+        curl = confirmation.generate_curl_command(api_info)
+
+        assert "curl -X POST" in curl
+        assert '"network": "10.0.0.0/24"' in curl
+
+
+class TestDisplayApiPreview:
+    """Tests for preview rendering"""
+
+    def test_unchanged_preview_reuses_render(self, confirmation, capsys):
+        """Test redrawing an unchanged api_info writes the cached render"""
+        api_info = confirmation.map_tool_to_api_call("infoblox_list_networks", {"max_results": 5})
+
+        confirmation.display_api_preview(api_info)
+        first = capsys.readouterr().out
+        confirmation.display_api_preview(api_info)
+
+        assert capsys.readouterr().out == first
+        assert confirmation._last_preview[1] == first
+
+    def test_edited_preview_rerenders(self, confirmation, capsys):
+        """Test changed params produce a fresh render"""
+        api_info = confirmation.map_tool_to_api_call("infoblox_list_networks", {"max_results": 5})
+
+        confirmation.display_api_preview(api_info)
+        api_info["params"]["_max_results"] = 50
+        confirmation.display_api_preview(api_info)
+
+        assert "_max_results: 50" in capsys.readouterr().out
+        assert "_max_results: 50" in confirmation._last_preview[1]
+
+
+class TestConfirmApiCall:
+    """Tests for the confirmation workflow"""
+
+    def test_auto_confirm_skips_prompt(self, mock_env_vars, monkeypatch, capsys):
+        """Test INFOBLOX_AUTO_CONFIRM executes without preview or input"""
+        monkeypatch.setenv("INFOBLOX_AUTO_CONFIRM", "1")
+        monkeypatch.setattr("builtins.input", lambda *_: pytest.fail("input() should not be called"))
+        get_settings.cache_clear()
+        tool_input = {"max_results": 5}
+
+        result = APICallConfirmation().confirm_api_call("infoblox_list_networks", tool_input)
+        get_settings.cache_clear()
+
+        assert result == (True, tool_input, None)
+        assert capsys.readouterr().out == ""
+
+    def test_decline(self, confirmation, monkeypatch, capsys):
+        """Test answering no cancels the call"""
+        monkeypatch.setattr("builtins.input", lambda *_: "no")
+
+        should_execute, _, username = confirmation.confirm_api_call("infoblox_list_networks", {})
+
+        assert should_execute is False
+        assert username is None
+        assert "API Call Preview" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+"""
+Unit tests for claude-chat reply caching
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def chat():
+    """Load claude-chat.py, whose file name is not importable"""
+    path = Path(__file__).resolve().parent.parent / "claude-chat.py"
+    spec = importlib.util.spec_from_file_location("claude_chat", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+REPLY = (
+    "Answer:\n- item one\n- item two\n\n"
+    "Next paragraph is long enough that it has to wrap across more than one "
+    "line of the terminal output."
+)
+
+
+class TestCachedReply:
+    """Tests for replaying a cached reply"""
+
+    def test_cached_reply_renders_like_live_reply(self, chat, capsys):
+        """Test a cached reply keeps the line breaks the streamed one had"""
+        wrapper = chat.StreamingWrapper()
+        for i in range(0, len(REPLY), 7):
+            wrapper.feed(REPLY[i:i + 7])
+        wrapper.flush()
+        live = capsys.readouterr().out
+
+        chat.print_reply(REPLY)
+
+        assert capsys.readouterr().out == live
+        assert "- item one" in live.split("\n")[1]
+
+
+class TestResponseCacheKey:
+    """Tests for response cache keys"""
+
+    def test_summary_is_part_of_key(self, chat):
+        """Test a question after /summarize does not match a fresh session"""
+        summarized = [{"role": "user", "content": "[summary] We discussed DNS zones."}]
+
+        assert (chat.response_cache_key("What next?", summarized)
+                != chat.response_cache_key("What next?", []))
+
+    def test_previous_reply_is_part_of_key(self, chat):
+        """Test the latest assistant reply takes precedence over a summary"""
+        history = [
+            {"role": "user", "content": "[summary] We discussed DNS zones."},
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello!"},
+        ]
+
+        assert chat.response_cache_key("What next?", history) == ("what next", "Hello!")
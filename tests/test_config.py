@@ -4,7 +4,8 @@ Unit tests for config module
 
 import pytest
 import os
-from config import Settings, ConfigurationError, get_settings
+import ssl
+from config import Settings, ConfigurationError, SSLContextAdapter, get_settings
 
 
 class TestSettingsInitialization:
@@ -102,6 +103,20 @@ class TestSettingsDefaults:
 
         assert settings.infoblox_verify_ssl is True
 
+    def test_auto_confirm_disabled_by_default(self, mock_env_vars, monkeypatch):
+        """Test API call confirmation is required by default"""
+        monkeypatch.delenv("INFOBLOX_AUTO_CONFIRM", raising=False)
+        settings = Settings()
+
+        assert settings.infoblox_auto_confirm is False
+
+    def test_auto_confirm_enabled(self, mock_env_vars, monkeypatch):
+        """Test API call confirmation can be skipped"""
+        monkeypatch.setenv("INFOBLOX_AUTO_CONFIRM", "1")
+        settings = Settings()
+
+        assert settings.infoblox_auto_confirm is True
+
     def test_default_rag_db_path(self, mock_env_vars):
         """Test default RAG database path"""
         settings = Settings()
@@ -187,8 +202,7 @@ class TestGetSettings:
     def test_get_settings_returns_singleton(self, mock_env_vars):
         """Test get_settings returns the same instance"""
         # Clear any existing instance
-        import config
-        config._settings = None
+        get_settings.cache_clear()
 
         settings1 = get_settings()
         settings2 = get_settings()
@@ -198,8 +212,7 @@ class TestGetSettings:
     def test_get_settings_raises_on_missing_config(self, monkeypatch):
         """Test get_settings raises ConfigurationError"""
         # Clear any existing instance
-        import config
-        config._settings = None
+        get_settings.cache_clear()
 
         # Clear environment variables
         for var in ["INFOBLOX_HOST", "INFOBLOX_USER", "INFOBLOX_PASSWORD", "ANTHROPIC_API_KEY"]:
@@ -258,6 +271,48 @@ class TestSSLConfiguration:
         # Should not display warning
         assert captured.out == ""
 
+    def test_ssl_context_built_once(self, mock_env_vars, monkeypatch):
+        """Test the SSL context is cached on the settings instance"""
+        monkeypatch.setenv("INFOBLOX_VERIFY_SSL", "true")
+        monkeypatch.delenv("INFOBLOX_CA_BUNDLE", raising=False)
+        settings = Settings()
+
+        context = settings.get_ssl_context()
+
+        assert context is settings.get_ssl_context()
+        assert context.verify_mode == ssl.CERT_REQUIRED
+        assert context.check_hostname is True
+
+    def test_ssl_context_disabled(self, mock_env_vars, monkeypatch):
+        """Test the SSL context skips verification when disabled"""
+        monkeypatch.setenv("INFOBLOX_VERIFY_SSL", "false")
+        monkeypatch.delenv("INFOBLOX_CA_BUNDLE", raising=False)
+        settings = Settings()
+
+        context = settings.get_ssl_context()
+
+        assert context.verify_mode == ssl.CERT_NONE
+        assert context.check_hostname is False
+
+    def test_ssl_context_missing_ca_bundle(self, mock_env_vars, monkeypatch):
+        """Test a missing CA bundle only fails when the context is needed"""
+        monkeypatch.setenv("INFOBLOX_CA_BUNDLE", "/path/to/missing-ca.pem")
+        settings = Settings()
+
+        with pytest.raises(OSError):
+            settings.get_ssl_context()
+
+    def test_session_shared(self, mock_env_vars, monkeypatch):
+        """Test get_session returns one authenticated session"""
+        monkeypatch.delenv("INFOBLOX_CA_BUNDLE", raising=False)
+        settings = Settings()
+
+        session = settings.get_session()
+
+        assert session is settings.get_session()
+        assert session.auth == ("testuser", "testpass")
+        assert isinstance(session.get_adapter("https://test.infoblox.local"), SSLContextAdapter)
+
 
 @pytest.mark.integration
 class TestSettingsWithEnvironment:
@@ -0,0 +1,66 @@
+"""
+Unit tests for deploy module
+"""
+
+import os
+
+import deploy
+from deploy import DeploymentManager, read_config_file
+
+
+def write_config(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestLoadConfig:
+    """Tests for loading deploy-config.ini"""
+
+    def test_default_section_reaches_builtin_sections(self, temp_dir):
+        """[DEFAULT] keys apply to sections only defined by load_config"""
+        config_file = temp_dir / "deploy-config.ini"
+        write_config(config_file, "[DEFAULT]\nextra = yes\n\n[python]\nversion = 3.11\n", 10**18)
+
+        config = DeploymentManager(str(config_file)).config
+
+        assert config.get("python", "version") == "3.11"
+        assert config.get("python", "extra") == "yes"
+        assert config.get("environment", "extra") == "yes"
+        assert config.get("deployment", "method") == "scp"
+
+    def test_section_overrides_default(self, temp_dir):
+        """A section's own value wins over [DEFAULT]"""
+        config_file = temp_dir / "deploy-config.ini"
+        write_config(config_file, "[DEFAULT]\nmethod = rsync\n\n[deployment]\nmethod = scp\n", 10**18)
+
+        config = DeploymentManager(str(config_file)).config
+
+        assert config.get("deployment", "method") == "scp"
+        assert config.get("testing", "method") == "rsync"
+
+
+class TestReadConfigFile:
+    """Tests for the mtime-keyed config cache"""
+
+    def test_reuses_parse_while_unchanged(self, temp_dir, monkeypatch):
+        """The file is parsed again only when its mtime changes"""
+        config_file = temp_dir / "deploy-config.ini"
+        write_config(config_file, "[python]\nversion = 3.11\n", 10**18)
+        monkeypatch.setattr(deploy, "_CONFIG_CACHE", {})
+
+        first = read_config_file(str(config_file))
+        write_config(config_file, "[python]\nversion = 3.12\n", 10**18)
+        assert read_config_file(str(config_file)) == first
+
+        write_config(config_file, "[python]\nversion = 3.12\n", 10**18 + 1)
+        assert read_config_file(str(config_file))["python"]["version"] == "3.12"
+
+    def test_callers_get_own_copy(self, temp_dir, monkeypatch):
+        """Mutating a returned dict does not touch the cache"""
+        config_file = temp_dir / "deploy-config.ini"
+        write_config(config_file, "[python]\nversion = 3.11\n", 10**18)
+        monkeypatch.setattr(deploy, "_CONFIG_CACHE", {})
+
+        read_config_file(str(config_file))["python"]["version"] = "2.7"
+
+        assert read_config_file(str(config_file))["python"]["version"] == "3.11"
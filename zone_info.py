@@ -5,7 +5,6 @@ Comprehensive DNS zone lookup for operations teams
 """
 
 from typing import Dict, Optional, Any, List
-import requests
 from config import get_settings
 from validators import InputValidator
 
@@ -14,9 +13,7 @@ class ZoneInfoClient:
 
     def __init__(self):
         self.settings = get_settings()
-        self.session = requests.Session()
-        self.session.auth = (self.settings.infoblox_user, self.settings.infoblox_password)
-        self.session.verify = self.settings.get_ssl_verify()
+        self.session = self.settings.get_session()
         self.base_url = self.settings.get_infoblox_base_url()
 
     def find_zone_detailed(self, zone_name: str) -> Dict[str, Any]: